@@ -20,13 +20,19 @@ limitations under the License.
 
 import json
 import asyncio
+import difflib
 import hashlib
+import logging
 import os
-from collections import OrderedDict
+import re
+import sys
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional, Callable, Coroutine, Iterator
+from dataclasses import dataclass, fields
 import json_repair
+import orjson
 
 import yaml
 from dotenv import load_dotenv
@@ -40,14 +46,182 @@ from tools.python_executor_tool import PythonExecutorTool
 from tools.web_user_communicate_tool import WebUserCommunicateTool
 from tools.web_result_delivery_tool import WebResultDeliveryTool
 from tools.json_path_generator import SmartJsonPathGenerator
-from jsonpath_ng.ext import parse
-from utils import set_json_path_value, get_json_path_value, extract_key_from_json_path
+from utils import set_json_path_value, get_json_path_value, extract_key_from_json_path, is_simple_json_path, compile_json_path
 from exceptions import TaskInputMissingError, TaskCreationError
-from tracing import ExecutionTracer, ExecutionStatus
+from tracing import ExecutionTracer, ExecutionStatus, _json_snapshot
 from tracing_wrappers import TracingToolWrapper, TracingLLMTool
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+
+# `{name}` placeholders in SOP tool parameters; keys are looked up verbatim in the variables dict
+_TEMPLATE_PLACEHOLDER_RE = re.compile(r"\{([^{}]+)\}")
+
+# Any XML-like tag; new tasks are only extracted from text wrapped in a tag (e.g.
+# <new_task_to_execute>), so unless always_llm_parse is set an output without one is skipped
+_XML_TAG_RE = re.compile(r"<[^<>\s][^<>]*>")
+
+# Longest YAML rendering of a single context value shown to the recovery-task prompt
+_RECOVERY_CONTEXT_VALUE_LIMIT = 2000
+
+# libyaml-backed dumper when PyYAML was built with it; same text as yaml.dump for plain data
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Leading `$.key` / `$.['key']` step of a JSON path; lets lookups bail out before parsing
+_JSON_PATH_ROOT_KEY_RE = re.compile(r"^\$\.(?:([A-Za-z_][A-Za-z0-9_]*)|\[(?:'([^']*)'|\"([^\"]*)\")\])")
+
+
+# Static head of the new-task extraction prompt. Kept byte-identical across calls so that
+# provider-side prefix caching can reuse it; only the task output and queue follow it.
+_NEW_TASK_EXTRACTION_PROMPT_PREFIX = """
+Analyze the output of the following text and extract any new task descriptions that need to be executed by agent. New task description is wrapped by <new task to execute> tag or other xml tag with similar meaning. If there is no such tag, do not consider it as new task to extract.
+
+**Important notes:**
+1. Only extract tasks that clearly and necessarily need to be executed next to achieve the intended deliverable, do not speculate.
+2. Task descriptions should be clear and specific. Make sure the task is understandable without any additional context. Keep reference documentation path as it is.
+3. If a reference doc is mentioned, include it in the task description.
+4. There can be overlap between task descriptions. Make sure each description is comprehensive and non-duplicative.
+5. Please use the original task description's language as your response language.
+6. If there is duplicate task with "Task list waiting for execute", skip the duplicated task and do not add it in tasks array.
+7. Do not add additional task requirement detailed if not explicitly specified.
+
+Here is the text that needs analysis:
+
+"""
+
+# Function schema for extracting new tasks; a module constant so its serialization never varies
+_EXTRACT_NEW_TASKS_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "extract_new_tasks",
+        "description": "Extract new task descriptions that need to be executed by the agent",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "think_process": {
+                    "type": "string",
+                    "description": "The process of analyze if there is new task for to do, and if there is any task duplicate with task list waiting for execute."
+                },
+                "tasks": {
+                    "type": "array",
+                    "description": "List of new task descriptions that need to be executed, each task should be a valid json string, be careful when you escape newline and quotes \". Empty array if no new tasks found.",
+                    "items": {
+                        "type": "string",
+                        "description": "A single task description string"
+                    }
+                }
+            },
+            "required": ["tasks"]
+        }
+    }
+}
+
+_EXTRACT_NEW_TASKS_TOOLS = [_EXTRACT_NEW_TASKS_TOOL]
+
+# Function schema for batch short-name assignment
+_ASSIGN_SHORT_NAMES_TOOLS = [{
+    "type": "function",
+    "function": {
+        "name": "assign_short_names",
+        "description": "Assign unique, short names for tasks in one batch",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "assignments": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "task_id": {"type": "string"},
+                            "short_name": {"type": "string"}
+                        },
+                        "required": ["task_id", "short_name"]
+                    }
+                }
+            },
+            "required": ["assignments"]
+        }
+    }
+}]
+
+# Function schema for judging whether a completed subtree satisfies its root task
+_EVALUATE_SUBTREE_TOOLS = [{
+    "type": "function",
+    "function": {
+        "name": "evaluate_and_summarize_subtree",
+        "description": "Evaluate if subtree meets root task requirements and provide summary or missing items",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "think_process": {
+                     "type": "string",
+                     "description": "analyze if requirement is met and if not met, what is missing, and how to fix the missing part."
+                },
+                "requirements_met": {
+                    "type": "boolean",
+                    "description": "True if root task requirements are fully satisfied by aggregated outputs"
+                },
+                "new_task_to_execute": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Array of new tasks to execute"
+                },
+                "summary": {
+                    "type": "string", 
+                    "description": "Concise summary of the subtree results if requirements are met"
+                },
+                "deliverable_output_path": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Array of output paths that contain useful results to be preserved in the compacted artifact"
+                }
+            },
+            "required": ["requirements_met"]
+        }
+    }
+}]
+
+
+def _shallow_asdict(obj: Any) -> Dict[str, Any]:
+    """Field dict of a dataclass without asdict's recursive copy.
+
+    Nested dicts and lists are shared with `obj`, and the tracer keeps phase data by
+    reference until the session is written, so only use this for objects whose
+    containers are not mutated afterwards.
+    """
+    return {field.name: getattr(obj, field.name) for field in fields(obj)}
+
+
+def _clip_middle(text: str, limit: int) -> str:
+    """Shorten text to about `limit` characters, keeping its head and tail (limit <= 0 disables)"""
+    if limit <= 0 or len(text) <= limit:
+        return text
+    half = limit // 2
+    return f"{text[:half]}\n... ({len(text) - 2 * half} characters omitted) ...\n{text[-half:]}"
+
+
+def _dict_to_xml(data: Dict[str, Any], field_limit: int = 0) -> str:
+    """Wrap each top-level value in an XML element named after its key, clipping long values"""
+    return "\n".join([
+        f"<{k}>\n{_clip_middle(v if isinstance(v, str) else str(v), field_limit)}\n</{k}>"
+        for k, v in data.items()
+    ])
+
+
+def _loads_json_lenient(text: str) -> Any:
+    """Parse JSON emitted by an LLM; the C parser handles well-formed output, json_repair the rest"""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json_repair.loads(text)
+
+
+def _generate_simple_short_name(description: str) -> str:
+    """Generate a simple short name from a task description: first 50 characters, "..." if truncated"""
+    return description if len(description) <= 50 else description[:47] + "..."
+
+
+@dataclass(slots=True)
 class PendingTask:
     """A reference to a task with metadata for stack management"""
     description: str
@@ -63,30 +237,26 @@ class PendingTask:
         
         # Auto-generate short_name if not provided
         if self.short_name is None:
-            self.short_name = self._generate_simple_short_name(self.description)
+            self.short_name = _generate_simple_short_name(self.description)
     
-    def _generate_simple_short_name(self, description: str) -> str:
-        """Generate a simple short name from task description"""
-        # Simple implementation: first 50 characters + "..." if truncated
-        if len(description) <= 50:
-            return description
-        else:
-            return description[:47] + "..."
-
     def _generate_deterministic_task_id(self) -> str:
         """Generate a stable, deterministic task id based on (parent_task_id + description).
 
-        Format: sha1(parent_task_id + '::' + description) first 16 hex chars.
+        Format: blake2b(parent_task_id + '::' + description) with an 8-byte digest (16 hex chars).
         This keeps IDs stable across runs for the same logical task structure.
         Note: If identical descriptions under the same parent are intentionally
         generated multiple times, their IDs will collide. If later we need
         disambiguation, we can append a sequence suffix at the engine level.
         """
         base = f"{self.parent_task_id or ''}::{self.description.strip()}".encode("utf-8")
-        return hashlib.sha1(base).hexdigest()[:16]
+        return hashlib.blake2b(base, digest_size=8).hexdigest()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same result as dataclasses.asdict; every field is a scalar, so no recursive copy is needed"""
+        return {name: getattr(self, name) for name in self.__slots__}
 
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """A task to be executed"""
     task_id: str
@@ -106,15 +276,12 @@ class Task:
     def __post_init__(self):
         # Auto-generate short_name if not provided
         if self.short_name is None:
-            self.short_name = self._generate_simple_short_name(self.description)
-    
-    def _generate_simple_short_name(self, description: str) -> str:
-        """Generate a simple short name from task description"""
-        # Simple implementation: first 50 characters + "..." if truncated
-        if len(description) <= 50:
-            return description
-        else:
-            return description[:47] + "..."
+            self.short_name = _generate_simple_short_name(self.description)
+
+    @property
+    def display_name(self) -> str:
+        """Short name for prompts and summaries, falling back to the description when it is empty"""
+        return self.short_name or self.description
 
     def __str__(self):
         # Return all fields as a formatted string for easy logging
@@ -147,29 +314,51 @@ class DocExecuteEngine:
     
     def __init__(self, docs_dir: str = "sop_docs", context_file: str = "context.json", 
                  enable_tracing: bool = True, trace_output_dir: str = "traces", 
-                 max_tasks: Optional[int] = 5, trace_session_file: Optional[str] = None):
+                 max_tasks: Optional[int] = 5, trace_session_file: Optional[str] = None,
+                 tracer_flush_threshold: int = 1, always_llm_parse: bool = False):
         self.docs_dir = Path(docs_dir)
         self.context_file = Path(context_file)
         self.context = {}
         self.task_stack: List[PendingTask] = []
+        # Subtree bookkeeping across pending and completed tasks, maintained by _add_pending_task
+        # and _mark_task_completed: parent links, children index and per-ancestor
+        # descendant / not-yet-completed counts
+        self._parent_of: Dict[str, Optional[str]] = {}
+        self._children_by_parent: Dict[str, set] = defaultdict(set)
+        self._descendant_count: Dict[str, int] = defaultdict(int)
+        self._incomplete_descendant_count: Dict[str, int] = defaultdict(int)
+        self._incomplete_task_ids: set = set()
         self.pending_tasks: Dict[str, PendingTask] = {}  # Index by task_id for quick lookups
         self.task_execution_counter = 0  # Counter for executed tasks
         self.task_retry_count = {}  # Track retry attempts for failed tasks
         self.max_retries = 3  # Maximum retry attempts per task
+        self.max_stack_depth: Optional[int] = 1000  # Pending tasks allowed on the stack (None = unlimited)
+        self._last_missing_field: Dict[str, str] = {}  # task_id -> field whose absence triggered the last retry
         self.last_task_output = None  # Store the last task output
         # Optional hard cap on number of tasks to execute in a single engine.start() session.
         # None (default) means unlimited until stack exhausted. When set, once task_execution_counter
         # reaches max_tasks the engine will stop gracefully with status INTERRUPTED, leaving any
         # remaining tasks on the stack.
         self.max_tasks = max_tasks
+        # Unless set, outputs that contain no XML-like tag at all skip the extraction LLM call
+        self.always_llm_parse = always_llm_parse
+        # Optional per-field character cap on tool output sent to new task extraction (0 = no cap)
+        self.task_parse_max_field_chars = int(os.getenv("DOCFLOW_TASK_PARSE_MAX_FIELD_CHARS", "0"))
         # Centralized map to store task short names by task_id for cross-references
         self.task_short_name_map: Dict[str, str] = {}
         
         # Task completion tracking for subtree compaction
         self.completed_tasks = OrderedDict()  # type: OrderedDict[str, Task]
         
+        # SOP bodies handed to tools, keyed by sop_doc_id (docs do not change during a run)
+        self._sop_body_cache: Dict[str, str] = {}
+        # `_temp_input_*` context keys created for the task being prepared; dropped after it runs
+        self._temp_input_keys: set = set()
+        
         # Initialize tracing (optionally with a predefined session file so orchestrator can expose it early)
-        self.tracer = ExecutionTracer(output_dir=trace_output_dir, enabled=enable_tracing, predefined_session_file=trace_session_file)
+        # tracer_flush_threshold > 1 batches per-phase trace writes (task ends are always written)
+        self.tracer = ExecutionTracer(output_dir=trace_output_dir, enabled=enable_tracing, predefined_session_file=trace_session_file,
+                                      flush_threshold=tracer_flush_threshold)
         
         # Wrap tools with tracing if enabled
         if enable_tracing:
@@ -202,6 +391,77 @@ class DocExecuteEngine:
         # Initialize JSON path generator
         self.json_path_generator = SmartJsonPathGenerator(self.tools.get("LLM"), self.tracer)
 
+    # Insert tasks only through _add_pending_task / _mark_task_completed, which keep the subtree
+    # bookkeeping in step; assigning a whole registry rebuilds it
+
+    @property
+    def pending_tasks(self) -> Dict[str, PendingTask]:
+        return self._pending_tasks
+
+    @pending_tasks.setter
+    def pending_tasks(self, tasks: Dict[str, PendingTask]) -> None:
+        self._pending_tasks = tasks
+        self._rebuild_task_index()
+
+    @property
+    def completed_tasks(self) -> Dict[str, Task]:
+        return self._completed_tasks
+
+    @completed_tasks.setter
+    def completed_tasks(self, tasks: Dict[str, Task]) -> None:
+        self._completed_tasks = tasks
+        self._rebuild_task_index()
+
+    def _add_pending_task(self, pending_task: PendingTask) -> None:
+        """Register a task in pending_tasks and update the subtree bookkeeping"""
+        self._pending_tasks[pending_task.task_id] = pending_task
+        self._track_task(pending_task)
+
+    def _mark_task_completed(self, task: Task) -> None:
+        """Register a task in completed_tasks and update the subtree bookkeeping"""
+        self._completed_tasks[task.task_id] = task
+        self._track_task(task)
+
+    def _ancestor_ids(self, task_id: str):
+        """Yield the known ancestors of a task, nearest first."""
+        parent_id = self._parent_of.get(task_id)
+        while parent_id:
+            yield parent_id
+            parent_id = self._parent_of.get(parent_id)
+
+    def _track_task(self, task) -> None:
+        """Update subtree bookkeeping after a task was added to pending_tasks or completed_tasks."""
+        task_id = task.task_id
+        completed = task_id in self._completed_tasks
+        if task_id not in self._parent_of:
+            self._parent_of[task_id] = task.parent_task_id
+            if task.parent_task_id:
+                self._children_by_parent[task.parent_task_id].add(task_id)
+            if not completed:
+                self._incomplete_task_ids.add(task_id)
+            # Descendants registered before this task was linked move up along with it
+            added = 1 + self._descendant_count.get(task_id, 0)
+            added_incomplete = (0 if completed else 1) + self._incomplete_descendant_count.get(task_id, 0)
+            for ancestor_id in self._ancestor_ids(task_id):
+                self._descendant_count[ancestor_id] += added
+                if added_incomplete:
+                    self._incomplete_descendant_count[ancestor_id] += added_incomplete
+        elif completed and task_id in self._incomplete_task_ids:
+            self._incomplete_task_ids.discard(task_id)
+            for ancestor_id in self._ancestor_ids(task_id):
+                self._incomplete_descendant_count[ancestor_id] -= 1
+
+    def _rebuild_task_index(self) -> None:
+        """Recompute subtree bookkeeping after a task registry has been replaced wholesale."""
+        self._parent_of = {}
+        self._children_by_parent = defaultdict(set)
+        self._descendant_count = defaultdict(int)
+        self._incomplete_descendant_count = defaultdict(int)
+        self._incomplete_task_ids = set()
+        for registry in (getattr(self, "_completed_tasks", {}), getattr(self, "_pending_tasks", {})):
+            for task in registry.values():
+                self._track_task(task)
+
     def _record_task_short_name(self, task_id: str, short_name: Optional[str]) -> None:
         """Record or update a task's short name in the centralized map."""
         if task_id and short_name:
@@ -222,12 +482,6 @@ class DocExecuteEngine:
         if not llm_tool:
             return        
 
-        # Prepare new task payload
-        new_tasks_payload = [
-            {"task_id": pt.task_id, "description": pt.description}
-            for pt in new_pending_tasks
-        ]
-
         # Build XML blocks to preserve newlines and avoid escaping issues
         existing_names_xml = "\n".join([f"<task><task_id>{task_id}</task_id><name>{sname}</name></task>" for task_id, sname in self.task_short_name_map.items() if sname])
         current_task_xml = (
@@ -235,8 +489,8 @@ class DocExecuteEngine:
             f"<short_name>{current_task.short_name}</short_name>"
         ) if current_task else "<current_task/>"
         new_tasks_xml = "\n".join([
-            f"<task>\n<task_id>{pt['task_id']}</task_id>\n<description>\n{pt['description']}\n</description>\n</task>"
-            for pt in new_tasks_payload
+            f"<task>\n<task_id>{pt.task_id}</task_id>\n<description>\n{pt.description}\n</description>\n</task>"
+            for pt in new_pending_tasks
         ])
 
         prompt = f"""
@@ -265,34 +519,9 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
 </new_tasks>
 """
 
-        assign_names_tool = {
-            "type": "function",
-            "function": {
-                "name": "assign_short_names",
-                "description": "Assign unique, short names for tasks in one batch",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "assignments": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "task_id": {"type": "string"},
-                                    "short_name": {"type": "string"}
-                                },
-                                "required": ["task_id", "short_name"]
-                            }
-                        }
-                    },
-                    "required": ["assignments"]
-                }
-            }
-        }
-
         llm_response = await llm_tool.execute({
             "prompt": prompt,
-            "tools": [assign_names_tool],
+            "tools": _ASSIGN_SHORT_NAMES_TOOLS,
             "model": llm_tool.small_model  # Use smaller model for efficiency
         })
 
@@ -305,7 +534,7 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
                     proposed = args.get("assignments")
                     if isinstance(proposed, str):
                         try:
-                            proposed = json_repair.loads(proposed)
+                            proposed = _loads_json_lenient(proposed)
                         except Exception:
                             proposed = []
                     if isinstance(proposed, list):
@@ -331,8 +560,9 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
     def _get_engine_state(self) -> Dict[str, Any]:
         """Get current engine state for tracing"""
         return {
-            "task_stack": [asdict(task) for task in self.task_stack],
-            "context": json.loads(json.dumps(self.context)),  # Deep copy
+            "task_stack": [task.to_dict() for task in self.task_stack],
+            # The tracer snapshots whatever state it records, so hand over the live context
+            "context": self.context,
             "task_execution_counter": self.task_execution_counter,
             "last_task_output": self.last_task_output
         }
@@ -347,7 +577,7 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
             raise TypeError(f"Tool must inherit from BaseTool, got {type(tool)}")
         
         self.tools[tool.tool_id] = tool
-        print(f"[TOOL_REGISTRY] Registered tool: {tool.tool_id}")
+        logger.debug("[TOOL_REGISTRY] Registered tool: %s", tool.tool_id)
     
     def get_available_tools(self) -> Dict[str, str]:
         """Get a list of available tools and their types
@@ -369,40 +599,108 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
         """Load context from file or initialize empty"""
         if load_if_exists and self.context_file.exists():
             with open(self.context_file, 'r', encoding='utf-8') as f:
-                self.context = json.load(f)
+                content = f.read()
+            try:
+                self.context = orjson.loads(content)
+            except orjson.JSONDecodeError:
+                # Contexts saved through the stdlib fallback may hold values orjson rejects
+                # (e.g. integers wider than 64 bits)
+                self.context = json.loads(content)
         else:
             self.context = {}
         return self.context
     
-    def save_context(self):
-        """Save context to file"""
+    def _encode_context(self) -> bytes:
+        """Serialize the context as indented JSON"""
+        try:
+            return orjson.dumps(self.context, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            # orjson rejects a few values the stdlib accepts (e.g. integers wider than 64 bits)
+            return json.dumps(self.context, ensure_ascii=False, indent=2).encode('utf-8')
+
+    def _write_context_file(self, data: bytes) -> None:
+        """Write an encoded context to the context file"""
         # Ensure target directory exists before writing
         self.context_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.context_file, 'w', encoding='utf-8') as f:
-            json.dump(self.context, f, ensure_ascii=False, indent=2)
+        # Replace the file in one step so readers (e.g. the job UI) never see a partial write
+        tmp_file = self.context_file.with_name(self.context_file.name + ".tmp")
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_file, self.context_file)
+
+    def save_context(self) -> bytes:
+        """Save context to file and return the JSON bytes that were written"""
+        data = self._encode_context()
+        self._write_context_file(data)
+        return data
+
+    async def save_context_async(self):
+        """Save context to file with the disk write off the event loop.
+
+        Encoding stays on the loop so the snapshot cannot interleave with later context mutations.
+        """
+        await asyncio.to_thread(self._write_context_file, self._encode_context())
     
     def load_sop_document(self, doc_id: str) -> SOPDocument:
         """Load and parse a SOP document by doc_id"""
         return self.sop_loader.load_sop_document(doc_id)
+
+    def get_sop_doc_body(self, doc_id: str) -> str:
+        """Return the body of a SOP document, loading it from disk only once per engine"""
+        body = self._sop_body_cache.get(doc_id)
+        if body is None:
+            body = self.sop_loader.load_sop_document(doc_id).body
+            self._sop_body_cache[doc_id] = body
+        return body
     
     def resolve_json_path(self, path: str, context: Dict[str, Any]) -> Any:
         """JSON path resolver using jsonpath_ng library"""
+        if is_simple_json_path(path):
+            return get_json_path_value(context, path)
+        # A missing top-level key can never match; skip the jsonpath machinery (unions excepted)
+        root_match = _JSON_PATH_ROOT_KEY_RE.match(path)
+        if root_match and '|' not in path:
+            root_key = next(group for group in root_match.groups() if group is not None)
+            if root_key not in context:
+                return None
         try:
-            jsonpath_expr = parse(path)
+            jsonpath_expr = compile_json_path(path)
             matches = jsonpath_expr.find(context)
             if matches:
                 return matches[0].value
             else:
                 return None
         except Exception as e:
-            print(f"Warning: Failed to resolve JSON path '{path}': {e}")
+            logger.warning("Failed to resolve JSON path '%s': %s", path, e)
             return None
     
+    def resolve_json_paths(self, paths: Dict[str, str], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Resolve several named JSON paths against the same context.
+
+        Inputs frequently point at the same location, so each distinct path is
+        resolved only once.
+        """
+        resolved_by_path: Dict[str, Any] = {}
+        for path in paths.values():
+            if path not in resolved_by_path:
+                resolved_by_path[path] = self.resolve_json_path(path, context)
+        return {key: resolved_by_path[path] for key, path in paths.items()}
+
     def render_template(self, template: str, variables: Dict[str, Any]) -> str:
         """Render template with variables using {var} syntax"""
-        for key, value in variables.items():
-            template = template.replace(f"{{{key}}}", str(value))
-        return template
+        # A placeholder may repeat; stringify each (possibly large) value once per render
+        rendered: Dict[str, str] = {}
+
+        def substitute(match: re.Match) -> str:
+            key = match.group(1)
+            if key in rendered:
+                return rendered[key]
+            if key in variables:
+                rendered[key] = text = str(variables[key])
+                return text
+            return match.group(0)
+
+        return _TEMPLATE_PLACEHOLDER_RE.sub(substitute, template)
 
     def _build_implicit_template_variables(self, task: Task) -> Dict[str, Any]:
         """Build a minimal set of implicit/default template variables.
@@ -429,47 +727,21 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
         }
     
     def add_execution_prefix_to_path(self, json_path: str) -> str:
-        """Add execution counter prefix to JSON path
-        
-        Args:
-            json_path: Original JSON path like '$.messages[0]' or '$.output'
-            
-        Returns:
-            JSON path with execution prefix like '$.msg1_messages[0]' or '$.msg1_output'
+        """Return the JSON path used to store a task's output.
+
+        Outputs used to be written under a per-execution key prefix
+        (e.g. '$.msg1_output'); that prefixing has been retired, so paths are
+        returned unchanged. The hook is kept so output placement has one place
+        to change if prefixing is ever reintroduced.
         """
-        if not json_path or not json_path.startswith('$.'):
-            return json_path
-            
-        # Extract the first level key after '$.'
-        # Handle cases like: $.key, $.key[0], $.key.subkey, etc.
-        parts = json_path[2:].split('.', 1)  # Remove '$.' and split on first '.'
-        if not parts[0]:
-            return json_path
-            
-        # Extract the key name (before any brackets)
-        first_key = parts[0].split('[')[0]
-        
-        # Create prefixed key
-        #prefixed_key = f"msg{self.task_execution_counter}_{first_key}"
-        prefixed_key = first_key
-        
-        # Rebuild the path
-        if '[' in parts[0]:  # Handle array notation like 'key[0]'
-            bracket_part = parts[0][len(first_key):]
-            new_first_part = prefixed_key + bracket_part
-        else:
-            new_first_part = prefixed_key
-            
-        if len(parts) > 1:  # Has additional parts after first dot
-            return f"$.{new_first_part}.{parts[1]}"
-        else:
-            return f"$.{new_first_part}"
+        return json_path
     
     async def create_task_from_sop(self, sop_doc: SOPDocument, pending_task: PendingTask, doc_selection_message: str = "") -> Task:
         """Create a task from a SOP document and PendingTask"""
 
         # Generate input JSON paths if not provided but input_description exists, iterate through input_description and see if the fields has path defined.
-        input_json_path = sop_doc.input_json_path
+        # Copy the paths since generated ones are added below and the SOP document is shared
+        input_json_path = dict(sop_doc.input_json_path)
         input_description_to_generate_path = {}
         existing_paths_missing_value = {}
         for field, field_description in sop_doc.input_description.items():
@@ -484,7 +756,7 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
                 existing_paths_missing_value[field] = configured_path
 
         if input_description_to_generate_path:
-            print(f"[TASK_CREATION] Generating input JSON paths for {sop_doc.doc_id}, {input_description_to_generate_path}")
+            logger.info("[TASK_CREATION] Generating input JSON paths for %s, %s", sop_doc.doc_id, input_description_to_generate_path)
             # Build a concise downstream tool/SOP description for the extractor prompts.
             # NOTE: Do not validate emptiness; only omit parts that are truly missing (None).
             sop_desc = sop_doc.description
@@ -502,26 +774,34 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
                 if completed_task.output_json_path:
                     key = extract_key_from_json_path(completed_task.output_json_path)
                     if key:
-                        context_key_meaning_map[key] = completed_task.short_name or completed_task.description
-
-            update_input_json_path = await self.json_path_generator.generate_input_json_paths(
-                input_description_to_generate_path,
-                self.context,
-                tool_description=tool_description,
-                user_original_ask=pending_task.description,
-                context_key_meaning_map=context_key_meaning_map,
-                task_short_name=pending_task.short_name
-            )
+                        context_key_meaning_map[key] = completed_task.display_name
+
+            try:
+                update_input_json_path = await self.json_path_generator.generate_input_json_paths(
+                    input_description_to_generate_path,
+                    self.context,
+                    tool_description=tool_description,
+                    user_original_ask=pending_task.description,
+                    context_key_meaning_map=context_key_meaning_map,
+                    task_short_name=pending_task.short_name
+                )
+            except Exception:
+                # Fields extracted before the failure already left temp keys behind
+                self._temp_input_keys.update(k for k in self.context if k.startswith("_temp_input_"))
+                raise
             for field, generated_path in update_input_json_path.items():
+                temp_key = extract_key_from_json_path(generated_path)
+                is_temp_key = bool(temp_key) and temp_key.startswith("_temp_input_")
                 if field in existing_paths_missing_value:
                     generated_value = get_json_path_value(self.context, generated_path)
                     if generated_value is not None:
                         set_json_path_value(self.context, existing_paths_missing_value[field], generated_value)
-                    temp_key = extract_key_from_json_path(generated_path)
-                    if temp_key and temp_key.startswith("_temp_input_") and temp_key in self.context:
+                    if is_temp_key and temp_key in self.context:
                         del self.context[temp_key]
                 else:
                     input_json_path[field] = generated_path
+                    if is_temp_key:
+                        self._temp_input_keys.add(temp_key)
 
         # For output, we now defer generation until after tool execution if we have output_description
         output_json_path = sop_doc.output_json_path
@@ -576,7 +856,7 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
 
             if not sop_doc_id:
                 # Use general fallback SOP document if no specific doc_id found
-                print("[TASK_CREATION] No specific SOP document found, using fallback SOP document")
+                logger.info("[TASK_CREATION] No specific SOP document found, using fallback SOP document")
                 sop_doc_id = "general/fallback"
                 doc_selection_message = ""
             
@@ -587,17 +867,21 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
                 # Append doc_selection_message to the SOP document body if present
                 if doc_selection_message:
                     sop_doc.body += f"\n\n## When applying this doc to task\n\n{doc_selection_message}"
-                    print(f"[TASK_CREATION] Added doc selection message to SOP body: {doc_selection_message}")
+                    logger.debug("[TASK_CREATION] Added doc selection message to SOP body: %s", doc_selection_message)
                     
             except FileNotFoundError:
                 raise ValueError(f"Cannot find SOP document for parsed doc_id: {sop_doc_id}")
             
-            # Set phase data with results
-            phase_ctx.set_data({
-                "input": {"description": pending_task.description, "pending_task": asdict(pending_task)},
-                "selected_doc_id": sop_doc_id,
-                "loaded_sop_document": asdict(sop_doc)
-            })
+            # Set phase data with results (the SOP copy is not free, so skip it when nobody records it)
+            pending_task_data = None
+            if self.tracer.enabled:
+                pending_task_data = pending_task.to_dict()
+                phase_ctx.set_data({
+                    "input": {"description": pending_task.description, "pending_task": pending_task_data},
+                    "selected_doc_id": sop_doc_id,
+                    # A real copy: create_task_from_sop later fills in sop_doc.input_json_path
+                    "loaded_sop_document": _json_snapshot(_shallow_asdict(sop_doc))
+                })
         
         # Start task creation phase
         with self.tracer.trace_phase_with_data("task_creation") as phase_ctx:
@@ -606,23 +890,30 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
             # Keep short name map in sync
             self._record_task_short_name(task.task_id, task.short_name)
             
-            # Set phase data
-            phase_ctx.set_data({
-                "sop_document": asdict(sop_doc),
-                "pending_task": asdict(pending_task),
-                "created_task": asdict(task)
-            })
+            # Set phase data; the pending task is unchanged since sop_resolution, but the
+            # SOP document is not (create_task_from_sop fills in generated input paths)
+            if self.tracer.enabled:
+                phase_ctx.set_data({
+                    "sop_document": _shallow_asdict(sop_doc),
+                    "pending_task": pending_task_data,
+                    "created_task": _shallow_asdict(task)
+                })
         
-        print(f"[TASK_CREATION] Created task: {task.description}")
-        print(f"                Task ID: {task.task_id}")
-        print(f"                Short name: {task.short_name}")
-        print(f"                Parent task ID: {task.parent_task_id}")
-        print(f"                SOP doc: {task.sop_doc_id}")
-        print(f"                Tool: {task.tool.get('tool_id', 'N/A')}")
-        print(f"                Input JSON paths: {task.input_json_path}")
-        print(f"                Output JSON path: {task.output_json_path}")
-        print(f"                Output description: {task.output_description}")
-        print(f"                Context: {json.dumps(self.context, ensure_ascii=False, indent=2)}")
+        logger.info("[TASK_CREATION] Created task: %s", task.description)
+        logger.info("                Task ID: %s", task.task_id)
+        logger.info("                Short name: %s", task.short_name)
+        logger.info("                SOP doc: %s", task.sop_doc_id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "                Parent task ID: %s\n"
+                "                Tool: %s\n"
+                "                Input JSON paths: %s\n"
+                "                Output JSON path: %s\n"
+                "                Output description: %s",
+                task.parent_task_id, task.tool.get('tool_id', 'N/A'), task.input_json_path,
+                task.output_json_path, task.output_description)
+            # Serializing the whole context is expensive; only do it when someone is listening
+            logger.debug("                Context: %s", json.dumps(self.context, ensure_ascii=False, indent=2))
         
         return task
     
@@ -633,22 +924,20 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
         # Record execution order on the task for downstream analysis
         task.execution_order = self.task_execution_counter
         
-        print(f"\n=== Executing Task #{self.task_execution_counter}: {task.description} ===")
-        print(f"SOP Doc: {task.sop_doc_id}")
+        logger.info("=== Executing Task #%s: %s ===", self.task_execution_counter, task.description)
+        logger.info("SOP Doc: %s", task.sop_doc_id)
         
         # Start task execution phase
         with self.tracer.trace_phase_with_data("task_execution") as phase_ctx:
             # Resolve input values from context
             input_values = self._build_implicit_template_variables(task)
+            resolved_inputs = self.resolve_json_paths(task.input_json_path, self.context)
             for key, path in task.input_json_path.items():
-                value = self.resolve_json_path(path, self.context)
+                value = resolved_inputs[key]
                 if value is None:
                     raise ValueError(f"Input path '{path}' not found in context: {self.context}")
                 input_values[key] = value
-                print(f"input {key}: {value}")
-            
-            # Prepare tool parameters
-            tool_params = task.tool.get('parameters', {}).copy()
+                logger.debug("input %s: %s", key, value)
             
             # Inject planning metadata when needed for planning/evaluation SOPs
             if self._needs_planning_metadata(task):
@@ -656,18 +945,20 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
                 planning_metadata = await self.sop_parser.get_planning_metadata(description_for_metadata)
                 planning_variables = self._build_planning_metadata_variables(planning_metadata)
                 input_values.update(planning_variables)
-                print(f"[TASK_EXECUTION] Injected planning metadata for task {task.task_id}")
+                logger.debug("[TASK_EXECUTION] Injected planning metadata for task %s", task.task_id)
             
-            # Render all string parameters with input values
-            for param_key, param_value in tool_params.items():
-                if isinstance(param_value, str):
-                    tool_params[param_key] = self.render_template(param_value, input_values)
+            # Prepare tool parameters, rendering string parameters that contain placeholders
+            tool_params = {
+                param_key: self.render_template(param_value, input_values)
+                if isinstance(param_value, str) and '{' in param_value else param_value
+                for param_key, param_value in task.tool.get('parameters', {}).items()
+            }
 
             # If input value key is not in tool_params, add it
             for key, value in input_values.items():
                 if key not in tool_params:
                     tool_params[key] = value
-                    print(f"Added task input parameter '{key}' with value to tools parameters as default value: {value}")
+                    logger.debug("Added task input parameter '%s' with value to tools parameters as default value: %s", key, value)
             
             # Get the tool ID first
             tool_id = task.tool.get('tool_id')
@@ -678,40 +969,41 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
             if tool_id == 'WEB_USER_COMMUNICATE' or tool_id == "WEB_RESULT_DELIVERY":
                 if 'session_id' not in tool_params:
                     tool_params['session_id'] = self.tracer.session.session_id if self.tracer.session else 'default_session'
-                    print(f"Auto-injected session_id: {tool_params['session_id']}")
+                    logger.debug("Auto-injected session_id: %s", tool_params['session_id'])
                 if 'task_id' not in tool_params:
                     tool_params['task_id'] = task.task_id
-                    print(f"Auto-injected task_id: {tool_params['task_id']}")
+                    logger.debug("Auto-injected task_id: %s", tool_params['task_id'])
                 if tool_id == "WEB_RESULT_DELIVERY" and 'job_id' not in tool_params:
                     job_id = os.getenv("DOCFLOW_JOB_ID")
                     if job_id:
                         tool_params['job_id'] = job_id
-                        print(f"Auto-injected job_id: {tool_params['job_id']}")
+                        logger.debug("Auto-injected job_id: %s", tool_params['job_id'])
             
             # Load SOP document body if available
             sop_doc_body = None
             if task.sop_doc_id:
                 try:
-                    sop_doc_body = self.sop_loader.load_sop_document(task.sop_doc_id).body
+                    sop_doc_body = self.get_sop_doc_body(task.sop_doc_id)
                 except Exception as e:
-                    print(f"[TASK_EXECUTION] Warning: Failed to load SOP body for {task.sop_doc_id}: {e}")
+                    logger.warning("[TASK_EXECUTION] Failed to load SOP body for %s: %s", task.sop_doc_id, e)
             
             # Call the tool with optional sop_doc_body
             tool_instance = self.tools[tool_id]
             # Capture nested LLM calls during actual tool execution
             with self.tracer.trace_tool_execution_step():
                 tool_output = await tool_instance.execute(tool_params, sop_doc_body=sop_doc_body)
-            print(f"Tool output: {tool_output}")
+            logger.debug("Tool output: %s", tool_output)
             
             # Set phase data with results
             phase_ctx.set_data({
-                "task": asdict(task),
+                "task": _shallow_asdict(task),
                 "input_resolution": {"resolved_inputs": input_values},
             })
         
         # Start context update phase
         with self.tracer.trace_phase_with_data("context_update") as phase_ctx:
-            context_before = json.loads(json.dumps(self.context))  # Deep copy
+            # Snapshots only feed the trace, so skip the copies when tracing is off
+            context_before = _json_snapshot(self.context) if self.tracer.enabled else None
             
             # Update context with output data using prefixed jsonpath
             updated_paths = []
@@ -725,12 +1017,12 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
                                    (task.output_json_path and get_json_path_value(self.context, task.output_json_path) is not None)
 
             if should_generate_path:
-                print(f"[TASK_EXECUTION] Generating new output JSON path for {task.sop_doc_id}.")
+                logger.info("[TASK_EXECUTION] Generating new output JSON path for %s.", task.sop_doc_id)
                 
                 # Use a more descriptive reason if the path already existed
                 description_for_generation = task.output_description
                 if task.output_json_path:
-                    print(f"[TASK_EXECUTION] Reason: Path '{task.output_json_path}' already contains a value.")
+                    logger.info("[TASK_EXECUTION] Reason: Path '%s' already contains a value.", task.output_json_path)
                     description_for_generation = f"A new location for: {task.output_description}"
 
                 # Use output path generation tracing context manager
@@ -742,37 +1034,54 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
                         task.description,
                         tool_output
                     )
-                    print(f"[TASK_EXECUTION] Generated output JSON path: {task.output_json_path}")
+                    logger.info("[TASK_EXECUTION] Generated output JSON path: %s", task.output_json_path)
                     output_ctx.set_result(generated_path=task.output_json_path)
             
             # Add execution prefix to output JSON path
             prefixed_output_path = self.add_execution_prefix_to_path(task.output_json_path)
             if task.output_json_path and prefixed_output_path != task.output_json_path:
-                print(f"[TASK_EXECUTION] Using prefixed output path: {prefixed_output_path}")
+                logger.debug("[TASK_EXECUTION] Using prefixed output path: %s", prefixed_output_path)
 
             # Set the tool output value to the context using the prefixed JSON path
             set_json_path_value(self.context, prefixed_output_path, tool_output)
-            print(f"Updated context at path '{prefixed_output_path}' with output")
+            logger.debug("Updated context at path '%s' with output", prefixed_output_path)
             updated_paths.append(prefixed_output_path)
             
             # Update task with final effective output path for compaction tracking
             task.output_json_path = prefixed_output_path
 
-            # Remove _temp_input_ * key from context
-            temp_keys = [k for k in self.context.keys() if k.startswith("_temp_input_")]
-            for key in temp_keys:
-                del self.context[key]
-                removed_temp_keys.append(key)
+            # Remove the _temp_input_* keys created while preparing this task
+            for key in self._temp_input_keys:
+                if key in self.context:
+                    del self.context[key]
+                    removed_temp_keys.append(key)
+            self._temp_input_keys.clear()
 
             # Record last task output
             self.last_task_output = tool_output
             self.context["last_task_output"] = tool_output
-            print(f"[TASK_EXECUTION] Recorded last task output in context")
+            logger.debug("[TASK_EXECUTION] Recorded last task output in context")
+
+            # Only the output's root key, the removed temp keys and last_task_output changed
+            # in this phase, so the after-snapshot shares every other copy with the before one
+            context_after = None
+            if self.tracer.enabled:
+                root_match = _JSON_PATH_ROOT_KEY_RE.match(prefixed_output_path)
+                if root_match and '|' not in prefixed_output_path:
+                    output_root_key = next(group for group in root_match.groups() if group is not None)
+                    context_after = dict(context_before)
+                    for key in (output_root_key, "last_task_output", *removed_temp_keys):
+                        if key in self.context:
+                            context_after[key] = _json_snapshot(self.context[key])
+                        else:
+                            context_after.pop(key, None)
+                else:
+                    context_after = _json_snapshot(self.context)
 
             # Set phase data with results
             phase_ctx.set_data({
                 "context_before": context_before,
-                "context_after": json.loads(json.dumps(self.context)),  # Deep copy
+                "context_after": context_after,
                 "updated_paths": updated_paths,
                 "removed_temp_keys": removed_temp_keys
             })
@@ -782,7 +1091,7 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
             # Use new task generation context manager
             with self.tracer.trace_new_task_generation_step() as step_ctx:
                 if task.skip_new_task_generation:
-                    print(f"[NEW_TASK_GEN] Skipping new task generation for task {task.task_id} due to skip_new_task_generation flag.")
+                    logger.info("[NEW_TASK_GEN] Skipping new task generation for task %s due to skip_new_task_generation flag.", task.task_id)
                     new_pending_tasks = []
                     step_ctx.set_result(
                         generated_tasks=[],
@@ -797,41 +1106,52 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
                     if new_pending_tasks:
                         await self.generate_short_names_for_pending_tasks(new_pending_tasks, current_task=task)
                 
+                generated_task_dicts = [pending_task.to_dict() for pending_task in new_pending_tasks]
                 # Set results in context manager
                 if not task.skip_new_task_generation:
                     step_ctx.set_result(
-                        generated_tasks=[asdict(pending_task) for pending_task in new_pending_tasks],
+                        generated_tasks=generated_task_dicts,
                         tool_output=tool_output,
                         task_description=task.description
                     )
             
             # Set phase data with task generation results
             phase_ctx.set_data({
-                "parent_task": asdict(task),
+                "parent_task": _shallow_asdict(task),
                 "tool_output": tool_output,
                 "current_task_description": task.description,
-                "generated_tasks": [asdict(pending_task) for pending_task in new_pending_tasks]
+                "generated_tasks": generated_task_dicts
             })
         
         # Mark task as completed and attempt subtree compaction
-        self.completed_tasks[task.task_id] = task
+        self._mark_task_completed(task)
         # Only attempt subtree compaction if no new subtasks were generated.
         # Rationale: Presence of newly generated subtasks indicates the subtree is not yet complete.
         if not new_pending_tasks:
             await self._attempt_subtree_compaction(task)
         else:
-            print(f"[COMPACTION] Skipping subtree compaction for task {task.task_id} because {len(new_pending_tasks)} new subtasks were generated.")
+            logger.debug("[COMPACTION] Skipping subtree compaction for task %s because %s new subtasks were generated.", task.task_id, len(new_pending_tasks))
 
         return new_pending_tasks
     
     async def run_task(self, task: Task):
         """Run a single task and save context"""
-        print(task)
+        logger.debug("%s", task)
         #input("Continue to execute task? Press Enter to continue...")
         new_task_list = await self.execute_task(task)
-        self.save_context()
+        await self.save_context_async()
         return new_task_list
 
+    def _push_tasks(self, stacked_tasks: List[PendingTask]) -> None:
+        """Push tasks onto the stack in order (the last one runs next), enforcing max_stack_depth"""
+        new_size = len(self.task_stack) + len(stacked_tasks)
+        if self.max_stack_depth is not None and new_size > self.max_stack_depth:
+            raise RuntimeError(
+                f"Task stack would grow to {new_size} pending tasks, exceeding "
+                f"max_stack_depth={self.max_stack_depth}; task generation or recovery looks runaway"
+            )
+        self.task_stack.extend(stacked_tasks)
+
     async def add_new_tasks(self, new_pending_tasks: List[PendingTask]) -> None:
         """Add new task references to the task stack
         
@@ -846,14 +1166,15 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
             return
             
         # Add tasks in reverse order so first task is executed first
-        for pending_task in reversed(new_pending_tasks):
-            self.task_stack.append(pending_task)
-            self.pending_tasks[pending_task.task_id] = pending_task
+        stacked_tasks = new_pending_tasks[::-1]
+        self._push_tasks(stacked_tasks)
+        for pending_task in stacked_tasks:
+            self._add_pending_task(pending_task)
             # Record short name in central map
             self._record_task_short_name(pending_task.task_id, pending_task.short_name)
-            print(f"[TASK_STACK] Added task to stack: {pending_task.short_name} (ID: {pending_task.task_id})")
+            logger.debug("Added task to stack: %s (ID: %s)", pending_task.short_name, pending_task.task_id)
         
-        print(f"[TASK_STACK] Stack size: {len(self.task_stack)}")
+        logger.info("[TASK_STACK] Added %s task(s) to stack, stack size: %s", len(stacked_tasks), len(self.task_stack))
 
     async def parse_new_tasks_from_output(self, output: Any, current_task: Task, task_stack: Optional[List[PendingTask]] = None) -> List[PendingTask]:
         """Parse new task descriptions from tool output using LLM with function calling.
@@ -872,22 +1193,29 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
         """
         if task_stack is None:
             task_stack = self.task_stack
+        # Checked on the raw output: clipping may cut a tag out, and rendering a dict adds tags
+        if not self.always_llm_parse and not _XML_TAG_RE.search(output if isinstance(output, str) else str(output)):
+            logger.debug("[TASK_PARSER] No tag in output, skipping new task extraction")
+            return []
+
         # Convert output to string
-        if isinstance(output, dict):
-            # Try to wrap each key using xml format, value as string
-            output_str = "\n".join([f"<{k}>\n{v}\n</{k}>" for k, v in output.items()])
+        field_limit = self.task_parse_max_field_chars
+        if isinstance(output, str):
+            output_str = _clip_middle(output, field_limit)
+        elif isinstance(output, dict):
+            output_str = _dict_to_xml(output, field_limit)
+        elif isinstance(output, (list, tuple)):
+            # One item per line rather than the Python repr of the whole sequence
+            output_str = _clip_middle("\n".join(item if isinstance(item, str) else str(item) for item in output), field_limit)
         else:
-            output_str = str(output)
+            output_str = _clip_middle(str(output), field_limit)
 
         # Use xml format to compact pending task description to string
         pending_task_list_str = "No tasks waiting in queue"
         if task_stack:
-            pending_descriptions = []
-            for pending in task_stack:
-                pending_descriptions.append(f"<task>{pending.description}</task>")
-            pending_task_list_str = "\n".join(pending_descriptions)
+            pending_task_list_str = "\n".join([f"<task>{pending.description}</task>" for pending in task_stack])
 
-        sop_doc_content = self.load_sop_document(current_task.sop_doc_id).body.strip()
+        sop_doc_content = self.get_sop_doc_body(current_task.sop_doc_id).strip()
         if sop_doc_content != "":
             sop_doc_content = f"<sop doc selected for this task: {current_task.sop_doc_id}>\n{sop_doc_content}\n</sop doc selected for this task: {current_task.sop_doc_id}>"
 
@@ -905,21 +1233,7 @@ Use the XML blocks below. Do not include any markdown. Return only via the funct
         tool_result_validation_hint = f"<Output Validation Hint>\n{tool_instance.get_result_validation_hint()}\n</Output Validation Hint>"
 
         # Create prompt for LLM to extract task descriptions
-        prompt = f"""
-Analyze the output of the following text and extract any new task descriptions that need to be executed by agent. New task description is wrapped by <new task to execute> tag or other xml tag with similar meaning. If there is no such tag, do not consider it as new task to extract.
-
-**Important notes:**
-1. Only extract tasks that clearly and necessarily need to be executed next to achieve the intended deliverable, do not speculate.
-2. Task descriptions should be clear and specific. Make sure the task is understandable without any additional context. Keep reference documentation path as it is.
-3. If a reference doc is mentioned, include it in the task description.
-4. There can be overlap between task descriptions. Make sure each description is comprehensive and non-duplicative.
-5. Please use the original task description's language as your response language.
-6. If there is duplicate task with "Task list waiting for execute", skip the duplicated task and do not add it in tasks array.
-7. Do not add additional task requirement detailed if not explicitly specified.
-
-Here is the text that needs analysis:
-
-<Task output content to analyze>
+        prompt = _NEW_TASK_EXTRACTION_PROMPT_PREFIX + f"""<Task output content to analyze>
 {output_str}
 </Task output content to analyze>
 
@@ -928,43 +1242,16 @@ Here is the text that needs analysis:
 </Task list waiting for execute>
 """
 
-        # Define the function schema for extracting new tasks
-        extract_tasks_tool = {
-            "type": "function",
-            "function": {
-                "name": "extract_new_tasks",
-                "description": "Extract new task descriptions that need to be executed by the agent",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "think_process": {
-                            "type": "string",
-                            "description": "The process of analyze if there is new task for to do, and if there is any task duplicate with task list waiting for execute."
-                        },
-                        "tasks": {
-                            "type": "array",
-                            "description": "List of new task descriptions that need to be executed, each task should be a valid json string, be careful when you escape newline and quotes \". Empty array if no new tasks found.",
-                            "items": {
-                                "type": "string",
-                                "description": "A single task description string"
-                            }
-                        }
-                    },
-                    "required": ["tasks"]
-                }
-            }
-        }
-
         llm_tool = self.tools.get("LLM")
         if not llm_tool:
             raise Exception("[TASK_PARSER] Warning: LLM tool not available, returning empty task list")
 
         llm_response = await llm_tool.execute({
             "prompt": prompt,
-            "tools": [extract_tasks_tool],
+            "tools": _EXTRACT_NEW_TASKS_TOOLS,
             "model": llm_tool.small_model  # Use smaller model for efficiency
         })
-        print(f"[TASK_PARSER] LLM response: {llm_response}")
+        logger.debug("[TASK_PARSER] LLM response: %s", llm_response)
         
         # Handle both string and dict responses (tool calls)
         if isinstance(llm_response, dict) and "tool_calls" in llm_response:
@@ -975,7 +1262,7 @@ Here is the text that needs analysis:
                     
                     # Validate that it's a list of strings
                     if isinstance(task_list, str):
-                        task_list = json_repair.loads(task_list)
+                        task_list = _loads_json_lenient(task_list)
                         assert(isinstance(task_list, list))
                     elif not isinstance(task_list, list):
                         raise ValueError(f"[TASK_PARSER] Tool call response is not a list: {task_list}")
@@ -985,7 +1272,7 @@ Here is the text that needs analysis:
                         if isinstance(task, str) and task.strip():
                             validated_tasks.append(task.strip())
                         else:
-                            print(f"[TASK_PARSER] Warning: Invalid task format: {task}")
+                            logger.warning("[TASK_PARSER] Invalid task format: %s", task)
                     
                     # Convert extracted task descriptions to PendingTask objects
                     pending_tasks = []
@@ -998,17 +1285,47 @@ Here is the text that needs analysis:
                         )
                         pending_tasks.append(pending_task)
                     
-                    print(f"[TASK_PARSER] Extracted {len(pending_tasks)} new tasks: {[pt.short_name for pt in pending_tasks]}")
+                    logger.info("[TASK_PARSER] Extracted %s new tasks: %s", len(pending_tasks), [pt.short_name for pt in pending_tasks])
                     return pending_tasks
             
             # No tool calls found with the expected function name
-            print("[TASK_PARSER] No extract_new_tasks tool call found, returning empty task list")
+            logger.debug("[TASK_PARSER] No extract_new_tasks tool call found, returning empty task list")
             return []
         else:
             # Fallback: No tool calls were made, assume no new tasks
-            print("[TASK_PARSER] No tool calls in response, returning empty task list")
+            logger.debug("[TASK_PARSER] No tool calls in response, returning empty task list")
             return []
 
+    def _summarize_context_for_recovery(self, field_name: str) -> str:
+        """Describe the context for a recovery prompt without dumping all of it.
+
+        Lists every top-level key and shows (size-capped) values only for keys that look
+        related to the missing field.
+        """
+        keys = [key for key in self.context if isinstance(key, str)]
+        if not keys:
+            return "(no information collected yet)"
+
+        field_tokens = {token for token in re.split(r"[^0-9a-z]+", field_name.lower()) if len(token) >= 3}
+        related = set(difflib.get_close_matches(field_name, keys, n=5, cutoff=0.6))
+        for key in keys:
+            if field_tokens & set(re.split(r"[^0-9a-z]+", key.lower())):
+                related.add(key)
+
+        sections = [f"Available top-level keys: {', '.join(keys)}"]
+        for key in keys:
+            if key not in related:
+                continue
+            try:
+                value_yaml = yaml.dump(self.context[key], Dumper=_YAML_DUMPER, allow_unicode=True, indent=2)
+            except yaml.representer.RepresenterError:
+                # Objects outside the safe YAML types need the full Python representer
+                value_yaml = yaml.dump(self.context[key], allow_unicode=True, indent=2)
+            if len(value_yaml) > _RECOVERY_CONTEXT_VALUE_LIMIT:
+                value_yaml = value_yaml[:_RECOVERY_CONTEXT_VALUE_LIMIT] + "\n... (truncated)\n"
+            sections.append(f"{key}:\n{value_yaml}")
+        return "\n".join(sections)
+
     async def generate_recovery_task(self, missing_error: TaskInputMissingError, task_description: str, parent_task_id: str = None) -> PendingTask:
         """Generate a recovery task to obtain missing input
         
@@ -1031,7 +1348,7 @@ Some information seems missing or not clarified for following task. Please gener
 - Field description: {missing_error.description}
 
 ## Current Available Information:
-{yaml.dump(self.context, allow_unicode=True, indent=2)}
+{self._summarize_context_for_recovery(missing_error.field_name)}
 
 ## Objective:
 Generate a clear, specific task description that would help obtain the missing information described in the field description. 
@@ -1075,7 +1392,7 @@ Please return only the task description as a single paragraph, without additiona
         3. Add any new tasks generated during execution back to the stack
         4. Continue until the stack is empty
         """
-        print("[ENGINE] Starting execution engine...")
+        logger.info("[ENGINE] Starting execution engine...")
         
         # Start tracing session using context manager
         with self.tracer.trace_session(initial_task_description, engine_state_provider=self._get_engine_state) as session_ctx:
@@ -1085,16 +1402,16 @@ Please return only the task description as a single paragraph, without additiona
                     description=initial_task_description
                     # task_id, short_name auto-generated, parent_task_id remains None for root task
                 )
-                self.task_stack.append(initial_pending_task)
-                self.pending_tasks[initial_pending_task.task_id] = initial_pending_task
+                self._push_tasks([initial_pending_task])
+                self._add_pending_task(initial_pending_task)
                 self._record_task_short_name(initial_pending_task.task_id, initial_pending_task.short_name)
-                print(f"[ENGINE] Added initial task: {initial_pending_task.short_name} (ID: {initial_pending_task.task_id})")
+                logger.info("[ENGINE] Added initial task: %s (ID: %s)", initial_pending_task.short_name, initial_pending_task.task_id)
 
             # Main execution loop
             while self.task_stack:
                 # Respect max_tasks limit if configured
                 if self.max_tasks is not None and self.task_execution_counter >= self.max_tasks:
-                    print(f"[ENGINE] Maximum task execution limit reached ({self.max_tasks}). Stopping engine.")
+                    logger.info("[ENGINE] Maximum task execution limit reached (%s). Stopping engine.", self.max_tasks)
                     # Mark session as interrupted for observability
                     session_ctx.set_status(ExecutionStatus.INTERRUPTED)
                     # Record in context for downstream inspection
@@ -1103,8 +1420,8 @@ Please return only the task description as a single paragraph, without additiona
 
                 # Pop the next task from the stack
                 pending_task = self.task_stack.pop()
-                print(f"\n[ENGINE] Processing task from stack: {pending_task.short_name} (ID: {pending_task.task_id})")
-                print(f"[ENGINE] Remaining tasks in stack: {len(self.task_stack)}")
+                logger.info("[ENGINE] Processing task from stack: %s (ID: %s)", pending_task.short_name, pending_task.task_id)
+                logger.debug("[ENGINE] Remaining tasks in stack: %s", len(self.task_stack))
 
                 # Use context-managed task execution tracing
                 with self.tracer.trace_task_execution(pending_task, engine_state_provider=self._get_engine_state) as task_ctx:
@@ -1121,30 +1438,36 @@ Please return only the task description as a single paragraph, without additiona
                             await self.add_new_tasks(new_pending_tasks)
                         # Success path; no explicit status needed (defaults to COMPLETED)
                     except TaskInputMissingError as e:
-                        print(f"[ENGINE] Task creation failed due to missing input: {e}")
+                        logger.warning("[ENGINE] Task creation failed due to missing input: %s", e)
 
                         # Check retry count (using task_id as key)
                         retry_count = self.task_retry_count.get(pending_task.task_id, 0)
                         if retry_count >= self.max_retries:
                             task_ctx.set_status(ExecutionStatus.FAILED, e)
                             raise TaskCreationError(task_description=pending_task.description, original_error=TaskInputMissingError)
+                        # The recovery task already ran and the same field is still missing; another
+                        # recovery prompt would ask for the same thing again
+                        if retry_count >= 1 and self._last_missing_field.get(pending_task.task_id) == e.field_name:
+                            task_ctx.set_status(ExecutionStatus.FAILED, e)
+                            raise TaskCreationError(task_description=pending_task.description, original_error=e)
+                        self._last_missing_field[pending_task.task_id] = e.field_name
 
                         # Increment retry count
                         self.task_retry_count[pending_task.task_id] = retry_count + 1
 
                         # Put the original task back on the stack (it will be retried after recovery)
-                        self.task_stack.append(pending_task)
-                        print(f"[ENGINE] Put failed task back on stack (attempt {retry_count + 1}/{self.max_retries}): {pending_task.short_name}")
+                        self._push_tasks([pending_task])
+                        logger.info("[ENGINE] Put failed task back on stack (attempt %s/%s): %s", retry_count + 1, self.max_retries, pending_task.short_name)
 
                         # Generate and add recovery task to the top of the stack (it will be executed first)
                         recovery_pending_task = await self.generate_recovery_task(e, pending_task.description, pending_task.task_id)
-                        self.task_stack.append(recovery_pending_task)
-                        self.pending_tasks[recovery_pending_task.task_id] = recovery_pending_task
-                        print(f"[ENGINE] Added recovery task to stack: {recovery_pending_task.short_name} (ID: {recovery_pending_task.task_id})")
+                        self._push_tasks([recovery_pending_task])
+                        self._add_pending_task(recovery_pending_task)
+                        logger.info("[ENGINE] Added recovery task to stack: %s (ID: %s)", recovery_pending_task.short_name, recovery_pending_task.task_id)
                         # Mark as retrying for this execution
                         task_ctx.set_status(ExecutionStatus.RETRYING, e)
 
-            print("[ENGINE] All tasks completed. Execution engine stopped.")
+            logger.info("[ENGINE] All tasks completed. Execution engine stopped.")
 
     async def _attempt_subtree_compaction(self, just_completed_task: Task) -> None:
         """Find and compact the highest possible ancestor subtree that is now complete"""
@@ -1174,10 +1497,9 @@ Please return only the task description as a single paragraph, without additiona
 
     async def _is_subtree_complete(self, root_task_id: str) -> bool:
         """Check if all descendants of the given task are completed"""
-        descendant_ids = self._collect_descendants(root_task_id)
-        # Root must also be completed, and no descendants should be pending
-        return (root_task_id in self.completed_tasks and 
-                all(desc_id in self.completed_tasks for desc_id in descendant_ids)), len(descendant_ids)
+        # Root must also be completed, and no descendants should be pending (counts kept by _track_task)
+        return (root_task_id in self.completed_tasks and
+                self._incomplete_descendant_count.get(root_task_id, 0) == 0), self._descendant_count.get(root_task_id, 0)
 
     def _collect_descendants(self, root_task_id: str) -> set[str]:
         """Collect all descendant task IDs for a given root task"""
@@ -1186,15 +1508,11 @@ Please return only the task description as a single paragraph, without additiona
         
         while frontier:
             current_id = frontier.pop()
-            # Search all known tasks (completed + pending) for children
-            all_tasks = list(self.completed_tasks.values()) + list(self.pending_tasks.values())
-            
-            for task in all_tasks:
-                if task.parent_task_id == current_id:
-                    task_id = task.task_id
-                    if task_id not in descendants:  # Avoid cycles
-                        descendants.add(task_id)
-                        frontier.append(task_id)
+            # Children of all known tasks (completed + pending) come from the index
+            for task_id in self._children_by_parent.get(current_id, ()):
+                if task_id not in descendants:  # Avoid cycles
+                    descendants.add(task_id)
+                    frontier.append(task_id)
         
         return descendants
 
@@ -1227,7 +1545,7 @@ Please return only the task description as a single paragraph, without additiona
     
         # Skip if no outputs to compact
         if not aggregated_outputs:
-            print(f"[COMPACTION] Skipping compaction for {root_task_id} - no outputs found")
+            logger.info("[COMPACTION] Skipping compaction for %s - no outputs found", root_task_id)
             return False
         
         # Start compaction phase
@@ -1236,20 +1554,28 @@ Please return only the task description as a single paragraph, without additiona
                 root_task = self.completed_tasks[root_task_id]
                 compaction_ctx.set_input(root_task_id, list(all_subtree_ids), aggregated_outputs, task_events=task_event_list)
                 
+                # The artifact path only depends on what is known before evaluation, so generate it
+                # speculatively while the subtree is evaluated; it is dropped if requirements are not met.
+                # Tracer step state is per asyncio task, so both LLM calls log into this step
+                speculative_path = None if single_task_subtree else \
+                    self._generate_compacted_artifact_path(root_task, aggregated_outputs)
+                
                 # Evaluate with LLM
-                requirements_met, missing_reqs, new_tasks, llm_result = await self._evaluate_subtree_completion(
-                    root_task, aggregated_outputs, task_event_list)
+                with self._speculative_task(speculative_path) as artifact_path_task:
+                    requirements_met, missing_reqs, new_tasks, llm_result = await self._evaluate_subtree_completion(
+                        root_task, aggregated_outputs, task_event_list)
                 
                 # Guard clause: requirements NOT met
                 if not requirements_met:
+                    self._discard_speculative_task(artifact_path_task)
                     if new_tasks:
                         await self.generate_short_names_for_pending_tasks(new_tasks, root_task)
                         await self.add_new_tasks(new_tasks)
-                        print(f"[COMPACTION] Added {len(new_tasks)} tasks for missing requirements in {root_task_id}")
+                        logger.info("[COMPACTION] Added %s tasks for missing requirements in %s", len(new_tasks), root_task_id)
                     compaction_ctx.set_result(
                         requirements_met=False,
                         missing_requirements=missing_reqs,
-                        generated_tasks=[asdict(task) for task in new_tasks]
+                        generated_tasks=[task.to_dict() for task in new_tasks]
                     )
                     phase_ctx.set_data({
                         "root_task_id": root_task_id,
@@ -1264,7 +1590,7 @@ Please return only the task description as a single paragraph, without additiona
                 if single_task_subtree:
                     # Single-task subtree: keep original output, no artifact or pruning
                     self.last_task_output = self.resolve_json_path(root_task.output_json_path, self.context)
-                    print(f"[COMPACTION] Single-task subtree {root_task_id} requirements met; kept original output path {root_task.output_json_path}.")
+                    logger.info("[COMPACTION] Single-task subtree %s requirements met; kept original output path %s.", root_task_id, root_task.output_json_path)
                     compaction_ctx.set_result(
                         requirements_met=True,
                         compacted_artifact_path=root_task.output_json_path
@@ -1280,12 +1606,13 @@ Please return only the task description as a single paragraph, without additiona
 
                 # Multi-task subtree: generate artifact & prune
                 artifact_path = await self._generate_compacted_artifact(
-                    root_task, aggregated_outputs, llm_result.get("summary", ""), llm_result.get("deliverable_output_path", []))
+                    root_task, aggregated_outputs, llm_result.get("summary", ""), llm_result.get("deliverable_output_path", []),
+                    artifact_path=await artifact_path_task)
                 pruned_paths = await self._prune_subtree_outputs(all_subtree_ids, compacted_artifact_json_path=artifact_path)
                 root_task.output_json_path = artifact_path
                 self.last_task_output = get_json_path_value(self.context, artifact_path)
-                self.save_context()
-                print(f"[COMPACTION] Compacted subtree {root_task_id} to {artifact_path}")
+                await self.save_context_async()
+                logger.info("[COMPACTION] Compacted subtree %s to %s", root_task_id, artifact_path)
                 compaction_ctx.set_result(
                     requirements_met=True,
                     compacted_artifact_path=artifact_path,
@@ -1358,42 +1685,6 @@ Use the evaluate_and_summarize_subtree function to provide your evaluation.
 </output json path content>
 """
 
-        # Define tool schema
-        evaluation_tool = {
-            "type": "function",
-            "function": {
-                "name": "evaluate_and_summarize_subtree",
-                "description": "Evaluate if subtree meets root task requirements and provide summary or missing items",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "think_process": {
-                             "type": "string",
-                             "description": "analyze if requirement is met and if not met, what is missing, and how to fix the missing part."
-                        },
-                        "requirements_met": {
-                            "type": "boolean",
-                            "description": "True if root task requirements are fully satisfied by aggregated outputs"
-                        },
-                        "new_task_to_execute": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Array of new tasks to execute"
-                        },
-                        "summary": {
-                            "type": "string", 
-                            "description": "Concise summary of the subtree results if requirements are met"
-                        },
-                        "deliverable_output_path": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Array of output paths that contain useful results to be preserved in the compacted artifact"
-                        }
-                    },
-                    "required": ["requirements_met"]
-                }
-            }
-        }
         
         # Call LLM
         llm_tool = self.tools.get("LLM")
@@ -1401,7 +1692,7 @@ Use the evaluate_and_summarize_subtree function to provide your evaluation.
         for model in [llm_tool.model, "gpt-5", "gemini-2.5-pro", "o3"]:
             response = await llm_tool.execute({
                 "prompt": prompt,
-                "tools": [evaluation_tool],
+                "tools": _EVALUATE_SUBTREE_TOOLS,
                 "model": model
             })
             
@@ -1421,40 +1712,71 @@ Use the evaluate_and_summarize_subtree function to provide your evaluation.
         new_tasks = []
         new_task_descriptions = result.get("new_task_to_execute", [])
         if not requirements_met and new_task_descriptions:
-            for task_desc in new_task_descriptions:
-                task_desc = task_desc.strip()
-                new_task = PendingTask(
+            root_task_id = root_task.task_id
+            # Blank entries would become tasks with an empty description
+            new_tasks = [
+                PendingTask(
                     description=task_desc,
-                    parent_task_id=root_task.task_id,
+                    parent_task_id=root_task_id,
                     generated_by_phase="subtree_compaction"
                 )
-                new_tasks.append(new_task)
+                for task_desc in map(str.strip, new_task_descriptions)
+                if task_desc
+            ]
         
         return requirements_met, missing_reqs, new_tasks, result
 
-    async def _generate_compacted_artifact(self, root_task: Task, aggregated_outputs: Dict[str, Any], 
-                                          summary: str, deliverable_output_paths: List[str]) -> str:
-        """Generate compacted artifact and store in context"""
+    @contextmanager
+    def _speculative_task(self, coro: Optional[Coroutine]) -> Iterator[Optional[asyncio.Task]]:
+        """Run `coro` as a task alongside the with-block, cancelling it if the block fails
+
+        Yields None when `coro` is None. Awaiting or discarding the task after a successful
+        block is left to the caller.
+        """
+        task = asyncio.create_task(coro) if coro is not None else None
+        try:
+            yield task
+        except (Exception, asyncio.CancelledError):
+            self._discard_speculative_task(task)
+            raise
+
+    @staticmethod
+    def _discard_speculative_task(task: Optional[asyncio.Task]) -> None:
+        """Cancel a speculative task whose result is no longer needed"""
+        if task is None:
+            return
+        task.cancel()
+        # Retrieve the outcome so a failure that raced the cancel is not reported as unhandled
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+    async def _generate_compacted_artifact_path(self, root_task: Task, aggregated_outputs: Dict[str, Any]) -> str:
+        """Generate the context path a compacted subtree artifact will be stored at"""
         # Use existing path generator to create output path
-        output_description = f"Compacted result for subtree rooted at: {root_task.short_name or root_task.description}"
+        output_description = f"Compacted result for subtree rooted at: {root_task.display_name}"
         
-        artifact_path = await self.json_path_generator.generate_output_json_path(
+        return await self.json_path_generator.generate_output_json_path(
             output_description,
             root_task.short_name or "compacted_subtree",
             self.context,
             root_task.description,
             aggregated_outputs
         )
-        
-        # Copy content from useful output paths into a new dict
+
+    async def _generate_compacted_artifact(self, root_task: Task, aggregated_outputs: Dict[str, Any], 
+                                          summary: str, deliverable_output_paths: List[str],
+                                          artifact_path: str) -> str:
+        """Generate compacted artifact and store it in context at `artifact_path`"""
+        # Copy content from useful output paths into a new dict; deliverables are usually
+        # subtree outputs, which were already resolved while aggregating
         compacted_output = {}
         for path in deliverable_output_paths:
-            value = self.resolve_json_path(path, self.context)
+            value = aggregated_outputs.get(path)
+            if value is None:
+                value = self.resolve_json_path(path, self.context)
             if value is None:
                 raise Exception(f"[COMPACTION] Error: deliverable output path {path} not found in context")
-            key = path.replace("$.", "") if path.startswith("$.") else path
-            key = key.replace(".", "_")  # Replace dots with underscores for valid keys
-            compacted_output[key] = value
+            key = path[2:] if path.startswith("$.") else path
+            compacted_output[key.replace(".", "_")] = value  # Replace dots with underscores for valid keys
 
         # Simplify long keys if necessary
         if any(len(k) > 40 for k in compacted_output.keys()):
@@ -1462,7 +1784,7 @@ Use the evaluate_and_summarize_subtree function to provide your evaluation.
 
         # Create compacted artifact with simplified structure (renamed key)
         artifact = {
-            "summary": summary or f"Compacted results for: {root_task.short_name or root_task.description}",
+            "summary": summary or f"Compacted results for: {root_task.display_name}",
             "compacted_output": compacted_output,
         }
         
@@ -1472,27 +1794,46 @@ Use the evaluate_and_summarize_subtree function to provide your evaluation.
 
     async def _prune_subtree_outputs(self, subtree_task_ids: set[str], compacted_artifact_json_path: Optional[str] = None) -> List[str]:
         """Prune subtree output paths from context, optionally preserving the compacted artifact output."""
-        pruned_paths = []
-        
-        # Get all output paths used by subtree tasks
-        for task_id in subtree_task_ids:
-            task = self.completed_tasks.get(task_id)
-            if task and task.output_json_path:
-                if compacted_artifact_json_path and task.output_json_path == compacted_artifact_json_path:
-                    continue
-                # Extract the key from JSON path using utility function
-                key = extract_key_from_json_path(task.output_json_path)
-                
-                # Remove from context
-                if key in self.context:
-                    del self.context[key]
-                    pruned_paths.append(task.output_json_path)
-                    print(f"[COMPACTION] Pruned path: {task.output_json_path}")
-        
+        # Top-level context key of every subtree output path (first path wins for shared keys)
+        path_by_key: Dict[str, str] = {}
+        # Walk whichever side is smaller: a subtree covering most completed tasks is cheaper to
+        # filter out of completed_tasks than to look up id by id
+        if len(subtree_task_ids) * 4 > len(self.completed_tasks):
+            subtree_tasks = (task for task_id, task in self.completed_tasks.items() if task_id in subtree_task_ids)
+        else:
+            subtree_tasks = (self.completed_tasks.get(task_id) for task_id in subtree_task_ids)
+        for task in subtree_tasks:
+            if task and task.output_json_path and task.output_json_path != compacted_artifact_json_path:
+                path_by_key.setdefault(extract_key_from_json_path(task.output_json_path), task.output_json_path)
+
+        pruned_keys = path_by_key.keys() & self.context.keys()
+        if not pruned_keys:
+            return []
+        pruned_paths = [path for key, path in path_by_key.items() if key in pruned_keys]
+        for key in pruned_keys:
+            del self.context[key]
+        logger.debug("[COMPACTION] Pruned %s path(s): %s", len(pruned_paths), pruned_paths)
+
         return pruned_paths
 
+def uvloop_loop_factory() -> Optional[Callable[[], asyncio.AbstractEventLoop]]:
+    """Loop factory for asyncio.Runner: uvloop when it is installed, else None (default loop)"""
+    # uvloop.install() is deprecated on Python 3.12+; hand the factory to the runner instead.
+    # uvloop is not available on Windows, where the default loop is used.
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
+
 async def main():
     """Execute the blog outline generation document"""
+    # Every task goes through the LLM (doc selection, path generation), so fail fast
+    # instead of waiting for the first request to be rejected.
+    if not os.getenv("OPENAI_API_KEY"):
+        logger.error("[ENGINE] OPENAI_API_KEY is not set; set it (a dummy value works for local proxies) and retry.")
+        return None
+
     # Initialize the engine
     engine = DocExecuteEngine(max_tasks=50)
     
@@ -1509,21 +1850,25 @@ async def main():
     task_description = "Check current time."
 
     # Execute the task
-    print("Executing...")
+    logger.info("[ENGINE] Executing: %s", task_description)
     result = await engine.start(task_description)
-    
-    # Display results
-    print("\n=== Execution Complete ===")
-    print(f"Result: {json.dumps(result, ensure_ascii=False, indent=2)}")
-    
-    # Display context for debugging
-    print("\n=== Context ===")
-    print(json.dumps(engine.context, ensure_ascii=False, indent=2))
+    logger.info("[ENGINE] Execution complete")
 
-    # Save context for future use
-    engine.save_context()
+    # The result is the script's output; progress and diagnostics go to the log (stderr)
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2, default=str)
+    sys.stdout.write("\n")
+    
+    # Save context for future use; the saved JSON doubles as the debug display
+    encoded_context = engine.save_context()
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[ENGINE] Context:\n%s", encoded_context.decode("utf-8"))
     
     return result
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # DOCFLOW_LOG_LEVEL=DEBUG additionally prints full context dumps and tool inputs/outputs
+    logging.basicConfig(level=os.getenv("DOCFLOW_LOG_LEVEL", "INFO").upper())
+    # Only pay for asyncio debug bookkeeping when explicitly requested
+    asyncio_debug = os.getenv("DOCFLOW_ASYNCIO_DEBUG", "").strip().lower() in {"1", "true", "yes", "on"}
+    with asyncio.Runner(debug=asyncio_debug, loop_factory=uvloop_loop_factory()) as runner:
+        runner.run(main())
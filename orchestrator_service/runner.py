@@ -4,6 +4,8 @@
 import argparse
 import asyncio
 import json
+import logging
+import os
 import sys
 from contextlib import suppress
 from datetime import datetime, timezone
@@ -15,7 +17,7 @@ from orchestrator_service.env_file import load_env_file
 # Add parent directory to path so we can import doc_execute_engine
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from doc_execute_engine import DocExecuteEngine
+from doc_execute_engine import DocExecuteEngine, uvloop_loop_factory
 
 
 async def _heartbeat(job_id: str, interval_seconds: int = 20):
@@ -82,12 +84,15 @@ def main():
     args = parser.parse_args()
 
     load_env_file(args.env_file)
+    # Engine progress is reported through logging; stderr is captured into the job log
+    logging.basicConfig(level=os.getenv("DOCFLOW_LOG_LEVEL", "INFO").upper())
     
     task_text = _load_task_description(args.task, args.task_file)
     print(f"Starting job {args.job_id} with task: {task_text}")
     
     # Run the job
-    asyncio.run(run_job(args.job_id, task_text, args.max_tasks, args.trace_file, args.context_file))
+    with asyncio.Runner(loop_factory=uvloop_loop_factory()) as runner:
+        runner.run(run_job(args.job_id, task_text, args.max_tasks, args.trace_file, args.context_file))
 
 
 if __name__ == "__main__":
@@ -3,6 +3,7 @@
 
 import asyncio
 import json
+import logging
 import os
 import time
 from dataclasses import dataclass
@@ -16,6 +17,8 @@ from langchain_core.documents import Document
 from sop_document import SOPDocumentLoader
 from utils.embedding_utils import get_text_embedding_sync
 
+logger = logging.getLogger(__name__)
+
 
 def _dedupe_docs_with_scores_by_doc_id(
     docs_with_scores: Sequence[Tuple[Document, float]],
@@ -133,11 +136,11 @@ class SOPDocVectorStore:
             try:
                 sop_doc = self.loader.load_sop_document(doc_id)
             except FileNotFoundError as exc:  # pragma: no cover - defensive log
-                print(f"[SOP_VECTOR_STORE] Missing file for {doc_id}: {exc}")
+                logger.warning("[SOP_VECTOR_STORE] Missing file for %s: %s", doc_id, exc)
                 skipped_docs_due_to_missing_file += 1
                 continue
             except ValueError as exc:  # e.g., missing YAML front matter
-                print(f"[SOP_VECTOR_STORE] Invalid document {doc_id}: {exc}")
+                logger.warning("[SOP_VECTOR_STORE] Invalid document %s: %s", doc_id, exc)
                 base_metadata["used_doc_id_fallback"] = True
                 invalid_docs += 1
             else:
@@ -185,11 +188,12 @@ class SOPDocVectorStore:
         self._vector_store = InMemoryVectorStore(embedding=self._embedding)
         if texts:
             if debug:
-                print(
+                logger.info(
                     "[SOP_VECTOR_STORE] Building in-memory store. "
-                    f"doc_ids={len(doc_ids)} primary_entries={primary_entries_added} "
-                    f"alias_entries={alias_entries_added} texts_to_embed={len(texts)} "
-                    f"invalid_docs={invalid_docs} missing_files={skipped_docs_due_to_missing_file}"
+                    "doc_ids=%s primary_entries=%s alias_entries=%s texts_to_embed=%s "
+                    "invalid_docs=%s missing_files=%s",
+                    len(doc_ids), primary_entries_added, alias_entries_added, len(texts),
+                    invalid_docs, skipped_docs_due_to_missing_file,
                 )
             await asyncio.to_thread(
                 self._vector_store.add_texts,
@@ -198,7 +202,7 @@ class SOPDocVectorStore:
             )
         if debug:
             dt = time.perf_counter() - t0
-            print(f"[SOP_VECTOR_STORE] build() complete in {dt:.3f}s")
+            logger.info("[SOP_VECTOR_STORE] build() complete in %.3fs", dt)
 
     async def similarity_search(self, query: str, k: int = 4) -> List[SOPVectorStoreResult]:
         """Return the top-K SOP documents that best match the query."""
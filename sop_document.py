@@ -16,7 +16,9 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import copy
 import json
+import logging
 import os
 import yaml
 import re
@@ -28,6 +30,8 @@ from xml.sax.saxutils import escape
 if TYPE_CHECKING:
     from sop_doc_vector_store import SOPDocVectorStore
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class SOPDocument:
@@ -52,6 +56,8 @@ class SOPDocumentLoader:
     
     def __init__(self, docs_dir: str = "sop_docs"):
         self.docs_dir = Path(docs_dir)
+        # Parsed documents keyed by path, valid while the file's (mtime_ns, size) is unchanged
+        self._doc_cache: Dict[Path, tuple] = {}
     
     def list_doc_ids(self) -> List[str]:
         """Return all SOP document IDs (relative paths without extension)."""
@@ -67,12 +73,28 @@ class SOPDocumentLoader:
         return sorted(doc_ids)
     
     def load_sop_document(self, doc_id: str) -> SOPDocument:
-        """Load and parse a SOP document by doc_id"""
+        """Load and parse a SOP document by doc_id
+
+        Parsed documents are cached until the file changes and the same instance is
+        returned on every hit, so callers must not modify it.
+        """
         doc_path = self.docs_dir / f"{doc_id}.md"
         
-        if not doc_path.exists():
+        try:
+            stat = doc_path.stat()
+        except FileNotFoundError:
             raise FileNotFoundError(f"SOP document not found: {doc_path}")
-        
+        file_version = (stat.st_mtime_ns, stat.st_size)
+        cached = self._doc_cache.get(doc_path)
+        if cached is not None and cached[0] == file_version:
+            return cached[1]
+
+        sop_doc = self._parse_sop_document(doc_id, doc_path)
+        self._doc_cache[doc_path] = (file_version, sop_doc)
+        return sop_doc
+
+    def _parse_sop_document(self, doc_id: str, doc_path: Path) -> SOPDocument:
+        """Read and parse the SOP document file at doc_path"""
         with open(doc_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
@@ -103,7 +125,7 @@ class SOPDocumentLoader:
         # Replace tool parameters with matching markdown sections
         tool_data = doc_data.get('tool', {})
         if 'parameters' in tool_data:
-            print(f"Replace parameter in doc: {doc_path}")
+            logger.debug("[SOP_LOADER] Replace parameter in doc: %s", doc_path)
             tool_data = self._replace_tool_parameters_with_sections(tool_data, parameters)
         
 
@@ -160,7 +182,7 @@ class SOPDocumentLoader:
                 # Check if we have a matching section in parameters
                 if section_ref in parameters:
                     updated_parameters[param_key] = parameters[section_ref]
-                    print(f"[SOP_LOADER] Replaced {param_key} with section '{section_ref}'")
+                    logger.debug("[SOP_LOADER] Replaced %s with section '%s'", param_key, section_ref)
         
         updated_tool['parameters'] = updated_parameters
         return updated_tool
@@ -174,6 +196,9 @@ class SOPDocumentParser:
         self.llm_tool = llm_tool
         self.tracer = tracer
         self._vector_store: Optional['SOPDocVectorStore'] = None
+        # Doc registry snapshots, built lazily on first use (see refresh_doc_registry)
+        self._all_doc_ids: Optional[List[str]] = None
+        self._available_tools: Optional[List[Dict[str, Any]]] = None
         # Default to a local on-disk cache directory so embeddings are reused across runs.
         # Can be overridden with EMBEDDING_CACHE_DIR.
         default_cache_dir = str((Path(__file__).resolve().parent / ".cache" / "embeddings").resolve())
@@ -215,7 +240,7 @@ class SOPDocumentParser:
             pattern = self._build_identifier_pattern(doc_id.lower())
             if re.search(pattern, description_lower):
                 candidates.append((doc_id, "full_path"))
-                print(f"[SOP_PARSER] Found candidate by full path match: {doc_id}")
+                logger.info("[SOP_PARSER] Found candidate by full path match: %s", doc_id)
         
         # 2. Try match file name without extension with word boundaries.
         for doc_id in all_doc_ids:
@@ -228,7 +253,7 @@ class SOPDocumentParser:
             pattern = self._build_identifier_pattern(filename.lower())
             if re.search(pattern, description_lower):
                 candidates.append((doc_id, "filename"))
-                print(f"[SOP_PARSER] Found candidate by filename match: {doc_id}")
+                logger.info("[SOP_PARSER] Found candidate by filename match: %s", doc_id)
 
         # Log candidate documents to tracing system
         candidate_doc_ids = [candidate[0] for candidate in candidates]
@@ -238,7 +263,7 @@ class SOPDocumentParser:
         # Use document selection tracing context manager
         with self.tracer.trace_document_selection_step() as doc_ctx:
             if not candidates:
-                print("No candidate documents found, trying tool selection")
+                logger.info("[SOP_PARSER] No candidate documents found, trying tool selection")
                 # No direct matches found, use LLM to determine if task can be completed by a tool
                 selected_tool_doc, doc_selection_message = await self._select_tool_for_task(description, completed_tasks_info)
                 
@@ -270,12 +295,25 @@ class SOPDocumentParser:
             # No message for direct matches
             return best_doc_id, ""
     
+    def refresh_doc_registry(self) -> None:
+        """Drop the cached doc ID / tool listings so the next lookup rescans docs_dir."""
+        self._all_doc_ids = None
+        self._available_tools = None
+
     def _get_all_doc_ids(self) -> List[str]:
         """Get all available SOP document IDs from the docs directory"""
-        return self.loader.list_doc_ids()
+        if self._all_doc_ids is None:
+            self._all_doc_ids = self.loader.list_doc_ids()
+        return list(self._all_doc_ids)
 
     def _get_available_tools(self) -> List[Dict[str, str]]:
         """Get available tool SOPs by scanning the tools directory"""
+        if self._available_tools is None:
+            self._available_tools = self._scan_available_tools()
+        return copy.deepcopy(self._available_tools)
+
+    def _scan_available_tools(self) -> List[Dict[str, str]]:
+        """Load the description of every tool SOP under docs_dir/tools"""
         available_tools = []
         
         tools_dir = self.loader.docs_dir / "tools"
@@ -296,7 +334,7 @@ class SOPDocumentParser:
                     "output_description": sop_doc.output_description,
                 })
             except Exception as e:
-                print(f"[TOOL_DISCOVERY] Warning: Could not load tool SOP {doc_id}: {e}")
+                logger.warning("[TOOL_DISCOVERY] Could not load tool SOP %s: %s", doc_id, e)
                 continue
 
         return available_tools
@@ -502,7 +540,7 @@ Please use the select_tool_for_task function to provide your analysis.
         # Extract results from tool call
         tool_calls = response.get("tool_calls", [])
         if not tool_calls:
-            print("[TOOL_SELECTION] No tool calls found, defaulting to general/plan")
+            logger.warning("[TOOL_SELECTION] No tool calls found, defaulting to general/plan")
             return "general/plan", ""
         
         tool_call = tool_calls[0]
@@ -515,11 +553,11 @@ Please use the select_tool_for_task function to provide your analysis.
         reasoning = arguments.get("reasoning", "No reasoning provided")
         message_to_user = arguments.get("message_to_user", "")
         
-        print(f"[TOOL_SELECTION] Can complete with tool: {can_complete}")
-        print(f"[TOOL_SELECTION] Selected doc: {selected_doc}")
-        print(f"[TOOL_SELECTION] Reasoning: {reasoning}")
+        logger.info("[TOOL_SELECTION] Can complete with tool: %s", can_complete)
+        logger.info("[TOOL_SELECTION] Selected doc: %s", selected_doc)
+        logger.info("[TOOL_SELECTION] Reasoning: %s", reasoning)
         if message_to_user:
-            print(f"[TOOL_SELECTION] Message to user: {message_to_user}")
+            logger.info("[TOOL_SELECTION] Message to user: %s", message_to_user)
         
         # Validate the selected tool doc exists
         if selected_doc not in valid_docs:
@@ -573,7 +611,7 @@ Please use the select_tool_for_task function to provide your analysis.
             await store.build()
             self._vector_store = store
         except Exception as exc:  # pragma: no cover - defensive log
-            print(f"[SOP_VECTOR_SEARCH] Unable to initialize vector store: {exc}")
+            logger.warning("[SOP_VECTOR_SEARCH] Unable to initialize vector store: %s", exc)
             raise exc
         return self._vector_store
     
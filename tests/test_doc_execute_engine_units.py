@@ -9,12 +9,16 @@ import sys
 import os
 import json
 import asyncio
+import tempfile
+from contextlib import contextmanager
+from dataclasses import asdict
 from unittest.mock import patch, MagicMock, AsyncMock
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from doc_execute_engine import DocExecuteEngine, Task
+from doc_execute_engine import DocExecuteEngine, Task, PendingTask, _clip_middle, _shallow_asdict
+from sop_document import SOPDocument
 
 
 class TestDocExecuteEngineUnits(unittest.TestCase):
@@ -69,6 +73,29 @@ class TestDocExecuteEngineUnits(unittest.TestCase):
         result = self.engine.render_template(template, variables)
         
         self.assertEqual(result, "Age: 25, Score: 95.5, Active: True")
+
+    def test_template_rendering_single_pass(self):
+        """Test substituted values are not re-expanded as templates"""
+        template = "{first} then {second}"
+        variables = {"first": "{second}", "second": "done"}
+        
+        result = self.engine.render_template(template, variables)
+        
+        self.assertEqual(result, "{second} then done")
+
+    def test_template_rendering_stringifies_repeated_value_once(self):
+        """Test a value used by several placeholders is converted to text once"""
+        class CountingValue:
+            calls = 0
+
+            def __str__(self):
+                CountingValue.calls += 1
+                return "value"
+
+        result = self.engine.render_template("{v} and {v}", {"v": CountingValue()})
+
+        self.assertEqual(result, "value and value")
+        self.assertEqual(CountingValue.calls, 1)
     
     def test_json_path_prefix_generation_simple(self):
         """Test execution prefix path generation with simple paths"""
@@ -240,6 +267,22 @@ class TestDocExecuteEngineUnits(unittest.TestCase):
                 result = self.engine.resolve_json_path(path, context)
                 self.assertIsNone(result)
     
+    def test_json_path_resolution_batch(self):
+        """Test resolving several named paths, including shared and missing ones"""
+        context = {"doc": {"title": "T", "tags": ["a", "b"]}}
+        paths = {
+            "title": "$.doc.title",
+            "heading": "$.doc.title",
+            "first_tag": "$.doc.tags[0]",
+            "missing": "$.doc.author",
+        }
+        
+        with patch.object(self.engine, "resolve_json_path", wraps=self.engine.resolve_json_path) as resolve:
+            result = self.engine.resolve_json_paths(paths, context)
+        
+        self.assertEqual(result, {"title": "T", "heading": "T", "first_tag": "a", "missing": None})
+        self.assertEqual(resolve.call_count, 3)
+    
     def test_task_dataclass_creation(self):
         """Test Task dataclass creation and validation"""
         task = Task(
@@ -260,6 +303,31 @@ class TestDocExecuteEngineUnits(unittest.TestCase):
         self.assertEqual(task.output_json_path, "$.result")
         self.assertEqual(task.output_description, "Test output description")
     
+    def test_task_display_name_falls_back_to_description(self):
+        """display_name prefers the short name and falls back to the description when it is empty"""
+        task = Task(task_id="t", description="Full description", sop_doc_id="general/test",
+                    tool={"tool_id": "LLM"}, input_json_path={}, output_json_path="$.result",
+                    short_name="Short")
+        self.assertEqual(task.display_name, "Short")
+        task.short_name = ""
+        self.assertEqual(task.display_name, "Full description")
+
+    def test_shallow_asdict_matches_asdict(self):
+        """_shallow_asdict yields the same payload as asdict, sharing nested containers"""
+        task = Task(
+            task_id="test-123",
+            description="Test task description",
+            sop_doc_id="general/test",
+            tool={"tool_id": "LLM", "parameters": {"param": "value"}},
+            input_json_path={"input": "$.data"},
+            output_json_path="$.result"
+        )
+
+        task_data = _shallow_asdict(task)
+
+        self.assertEqual(task_data, asdict(task))
+        self.assertIs(task_data["tool"], task.tool)
+
     def test_task_dataclass_string_representation(self):
         """Test Task dataclass string representation"""
         task = Task(
@@ -307,13 +375,11 @@ class TestDocExecuteEngineUnits(unittest.TestCase):
         self.assertEqual(state["context"]["nested"]["data"], 123)
         self.assertEqual(state["task_execution_counter"], 5)
         
-        # Verify it's a deep copy (modifying original shouldn't affect state)
+        # The task stack is captured, but the context is handed over as is: the tracer
+        # snapshots the state it records, so copying here as well would copy it twice
         self.engine.task_stack.append("task3")
-        self.engine.context["new_key"] = "new_value"
-        
-        # State should remain unchanged
         self.assertEqual(len(state["task_stack"]), 2)
-        self.assertNotIn("new_key", state["context"])
+        self.assertIs(state["context"], self.engine.context)
     
     def test_get_available_tools_empty(self):
         """Test get_available_tools with empty tools dict"""
@@ -378,23 +444,50 @@ class TestDocExecuteEngineUnits(unittest.TestCase):
         self.assertEqual(context, {})
         self.assertEqual(engine.context, {})
     
-    @patch('builtins.open', new_callable=unittest.mock.mock_open)
-    @patch('json.dump')
-    def test_save_context(self, mock_json_dump, mock_open_file):
+    def test_save_context(self):
         """Test saving context to file"""
-        engine = DocExecuteEngine()
-        engine.context = {"save_test": "data", "number": 42}
-        
-        engine.save_context()
-        
-        mock_open_file.assert_any_call(engine.context_file, 'w', encoding='utf-8')
-        mock_json_dump.assert_called_once()
-        
-        # Verify json.dump was called with correct parameters
-        call_args = mock_json_dump.call_args
-        self.assertEqual(call_args[0][0], {"save_test": "data", "number": 42})
-        self.assertEqual(call_args[1]["ensure_ascii"], False)
-        self.assertEqual(call_args[1]["indent"], 2)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            engine = DocExecuteEngine(context_file=os.path.join(tmp_dir, "context.json"))
+            engine.context = {"save_test": "data", "number": 42, "text": "中文"}
+            
+            returned = engine.save_context()
+            
+            with open(engine.context_file, 'r', encoding='utf-8') as f:
+                saved = f.read()
+            
+            # Same layout as json.dump(..., ensure_ascii=False, indent=2)
+            self.assertEqual(saved, json.dumps(engine.context, ensure_ascii=False, indent=2))
+            self.assertEqual(returned.decode('utf-8'), saved)
+            
+            engine.context = {}
+            self.assertEqual(engine.load_context(), {"save_test": "data", "number": 42, "text": "中文"})
+
+    def test_save_context_falls_back_for_wide_integers(self):
+        """Test values orjson cannot encode are still saved"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            engine = DocExecuteEngine(context_file=os.path.join(tmp_dir, "context.json"))
+            engine.context = {"big": 2 ** 70}
+            
+            engine.save_context()
+
+            self.assertEqual(engine.load_context(), {"big": 2 ** 70})
+
+    def test_save_context_async_snapshots_before_writing(self):
+        """Test the async save writes the context as it was when the save started"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            engine = DocExecuteEngine(context_file=os.path.join(tmp_dir, "nested", "context.json"))
+            engine.context = {"step": 1}
+
+            async def save_then_mutate():
+                save = asyncio.ensure_future(engine.save_context_async())
+                await asyncio.sleep(0)
+                engine.context["step"] = 2
+                await save
+
+            asyncio.run(save_then_mutate())
+
+            with open(engine.context_file, 'r', encoding='utf-8') as f:
+                self.assertEqual(json.load(f), {"step": 1})
 
     def test_last_task_output_initialization(self):
         """Test that last_task_output is initialized to None"""
@@ -437,9 +530,130 @@ class TestDocExecuteEngineUnits(unittest.TestCase):
         self.assertEqual(engine.task_execution_counter, 0)
         self.assertTrue(engine.context.get('max_tasks_reached'))
 
+    def test_collect_descendants_uses_children_index(self):
+        """Descendants include tasks added to the stack and tasks registered by assignment"""
+        engine = DocExecuteEngine(enable_tracing=False)
+        root = PendingTask(description="root")
+        child = PendingTask(description="child", parent_task_id=root.task_id)
+        grandchild = PendingTask(description="grandchild", parent_task_id=child.task_id)
+        asyncio.run(engine.add_new_tasks([root, child, grandchild]))
+
+        self.assertEqual(engine._collect_descendants(root.task_id), {child.task_id, grandchild.task_id})
+        self.assertEqual(engine._collect_descendants(grandchild.task_id), set())
+
+        engine.pending_tasks = {}
+        engine.completed_tasks = {child.task_id: child}
+        self.assertEqual(engine._collect_descendants(root.task_id), {child.task_id})
+
+    def test_subtree_completion_counters_follow_task_completion(self):
+        """Per-ancestor counters track pending descendants as tasks are added and completed"""
+        engine = DocExecuteEngine(enable_tracing=False)
+        root = PendingTask(description="root")
+        child = PendingTask(description="child", parent_task_id=root.task_id)
+        grandchild = PendingTask(description="grandchild", parent_task_id=child.task_id)
+        asyncio.run(engine.add_new_tasks([root, child, grandchild]))
+
+        for pending_task in (root, child):
+            engine._mark_task_completed(pending_task)
+        self.assertEqual(asyncio.run(engine._is_subtree_complete(root.task_id)), (False, 2))
+
+        engine._mark_task_completed(grandchild)
+        self.assertEqual(asyncio.run(engine._is_subtree_complete(root.task_id)), (True, 2))
+        self.assertEqual(asyncio.run(engine._is_subtree_complete(child.task_id)), (True, 1))
+
+    def test_subtree_counters_match_rebuild_after_tracked_inserts(self):
+        """Counters kept incrementally match a full rebuild, whatever order tasks are tracked in"""
+        engine = DocExecuteEngine(enable_tracing=False)
+        root = PendingTask(description="root")
+        child = PendingTask(description="child", parent_task_id=root.task_id)
+        grandchild = PendingTask(description="grandchild", parent_task_id=child.task_id)
+
+        def bookkeeping():
+            def nonzero(counts):
+                return {task_id: count for task_id, count in counts.items() if count}
+            return (dict(engine._parent_of), nonzero(engine._descendant_count),
+                    nonzero(engine._incomplete_descendant_count), set(engine._incomplete_task_ids))
+
+        def assert_matches_rebuild():
+            incremental = bookkeeping()
+            engine._rebuild_task_index()
+            self.assertEqual(incremental, bookkeeping())
+
+        # Child registered before its parent, the way recovery and compaction can order them
+        for pending_task in (child, root, grandchild):
+            engine._add_pending_task(pending_task)
+        assert_matches_rebuild()
+
+        for pending_task in (root, child):
+            engine._mark_task_completed(pending_task)
+        assert_matches_rebuild()
+        self.assertEqual(asyncio.run(engine._is_subtree_complete(root.task_id)), (False, 2))
+
+        engine._mark_task_completed(grandchild)
+        assert_matches_rebuild()
+        self.assertEqual(asyncio.run(engine._is_subtree_complete(root.task_id)), (True, 2))
+
+        # The registries are plain mappings, so copies are ordinary detached snapshots
+        snapshot = engine.completed_tasks.copy()
+        snapshot.pop(grandchild.task_id)
+        self.assertIn(grandchild.task_id, engine.completed_tasks)
+        assert_matches_rebuild()
+
+    def test_clip_middle_keeps_head_and_tail(self):
+        """Long task-parse fields keep both ends so trailing task tags survive"""
+        text = "<new_task_to_execute>a</new_task_to_execute>" + "x" * 1000 + "<new_task_to_execute>b</new_task_to_execute>"
+
+        clipped = _clip_middle(text, 100)
+
+        self.assertTrue(clipped.startswith("<new_task_to_execute>a"))
+        self.assertTrue(clipped.endswith("b</new_task_to_execute>"))
+        self.assertIn("characters omitted", clipped)
+        self.assertEqual(_clip_middle(text, 0), text)
+
+    def test_summarize_context_for_recovery(self):
+        """Recovery prompts list every key but only show capped values of related keys"""
+        engine = DocExecuteEngine(enable_tracing=False)
+        engine.context = {"user_profile": {"name": "Ada"}, "report_draft": "x" * 5000, "weather": "sunny"}
+
+        summary = engine._summarize_context_for_recovery("user_name")
+
+        self.assertIn("Available top-level keys: user_profile, report_draft, weather", summary)
+        self.assertIn("user_profile:\nname: Ada", summary)
+        self.assertNotIn("sunny", summary)
+        self.assertLess(len(engine._summarize_context_for_recovery("report")), 2200)
+
+        # Values the safe dumper rejects still render through the default one
+        engine.context = {"user_tags": frozenset(["admin"])}
+        self.assertIn("!!python/object/apply:builtins.frozenset", engine._summarize_context_for_recovery("user_tags"))
+
+    @patch.object(DocExecuteEngine, "_compact_subtree", new_callable=AsyncMock)
+    def test_attempt_subtree_compaction_compacts_highest_complete_ancestor(self, mock_compact):
+        """Completion is read from per-ancestor counters while climbing the parent chain"""
+        engine = DocExecuteEngine(enable_tracing=False)
+
+        def make_task(task_id, parent_task_id=None):
+            return Task(task_id=task_id, description=task_id, sop_doc_id="dummy/doc", tool={"tool_id": "LLM"},
+                        input_json_path={}, output_json_path=f"$.{task_id}", output_description="Output",
+                        parent_task_id=parent_task_id)
+
+        tasks = [make_task("root"), make_task("a", "root"), make_task("b", "root"), make_task("b1", "b")]
+        engine.completed_tasks = {task.task_id: task for task in tasks}
+
+        asyncio.run(engine._attempt_subtree_compaction(tasks[-1]))
+
+        mock_compact.assert_awaited_once_with("root")
+
+        # A pending sibling keeps the root open, so only the completed branch is compacted
+        mock_compact.reset_mock()
+        engine.pending_tasks = {"c": PendingTask(description="c", task_id="c", parent_task_id="root")}
+        asyncio.run(engine._attempt_subtree_compaction(tasks[-1]))
+
+        mock_compact.assert_awaited_once_with("b")
+        self.assertEqual(asyncio.run(engine._is_subtree_complete("root")), (False, 4))
+
     @patch("doc_execute_engine.SmartJsonPathGenerator.generate_output_json_path", new_callable=AsyncMock)
     @patch.object(DocExecuteEngine, "generate_short_names_for_pending_tasks", new_callable=AsyncMock)
-    @patch.object(DocExecuteEngine, "save_context")
+    @patch.object(DocExecuteEngine, "save_context_async", new_callable=AsyncMock)
     @patch("doc_execute_engine.LLMTool")
     def test_compact_subtree_success(self, mock_llm_cls, mock_save_context, mock_generate_short_names, mock_generate_output_path):
         """Compact subtree should synthesize artifact and prune original keys when requirements met."""
@@ -504,11 +718,11 @@ class TestDocExecuteEngineUnits(unittest.TestCase):
         self.assertEqual(root_task.output_json_path, "$.compacted_result")
         self.assertEqual(engine.last_task_output["summary"], "All objectives are satisfied.")
         mock_generate_output_path.assert_awaited_once()
-        mock_save_context.assert_called()
+        mock_save_context.assert_awaited()
 
     @patch("doc_execute_engine.SmartJsonPathGenerator.generate_output_json_path", new_callable=AsyncMock)
     @patch.object(DocExecuteEngine, "generate_short_names_for_pending_tasks", new_callable=AsyncMock)
-    @patch.object(DocExecuteEngine, "save_context")
+    @patch.object(DocExecuteEngine, "save_context_async", new_callable=AsyncMock)
     @patch("doc_execute_engine.LLMTool")
     def test_compact_subtree_unmet_requirements(self, mock_llm_cls, mock_save_context, mock_generate_short_names, mock_generate_output_path):
         """When requirements are not met, engine should enqueue follow-up tasks and skip compaction."""
@@ -553,7 +767,7 @@ class TestDocExecuteEngineUnits(unittest.TestCase):
                         "check_requirement_one_by_one": "Requirement analysis shows final summary is missing",
                         "requirements_met": False,
                         "missing_requirements": ["完成最终总结"],
-                        "new_task_to_execute": ["<new_task_to_execute>Follow llm.md to 完成最终总结</new_task_to_execute>"]
+                        "new_task_to_execute": ["<new_task_to_execute>Follow llm.md to 完成最终总结</new_task_to_execute>", "  "]
                     }
                 }
             ]
@@ -570,7 +784,70 @@ class TestDocExecuteEngineUnits(unittest.TestCase):
         self.assertEqual(next_task.parent_task_id, "root")
         mock_generate_short_names.assert_awaited_once()
         mock_generate_output_path.assert_not_awaited()
-        mock_save_context.assert_not_called()
+        mock_save_context.assert_not_awaited()
+
+    @patch.object(DocExecuteEngine, "save_context_async", new_callable=AsyncMock)
+    def test_compact_subtree_generates_artifact_path_during_evaluation(self, mock_save_context):
+        """The artifact path LLM call overlaps the subtree evaluation instead of following it."""
+        engine = DocExecuteEngine(enable_tracing=False)
+        engine.context = {"root_output": "draft", "child_output": "details"}
+        engine.completed_tasks = {
+            "root": Task(task_id="root", description="Produce final answer", sop_doc_id="dummy/root",
+                         tool={"tool_id": "LLM"}, input_json_path={}, output_json_path="$.root_output"),
+            "child": Task(task_id="child", description="Gather details", sop_doc_id="dummy/child",
+                          tool={"tool_id": "LLM"}, input_json_path={}, output_json_path="$.child_output",
+                          parent_task_id="root"),
+        }
+
+        async def run():
+            path_generation_started = asyncio.Event()
+
+            async def generate_output_json_path(*args, **kwargs):
+                path_generation_started.set()
+                return "$.compacted_result"
+
+            async def evaluate(params, **kwargs):
+                # Only completes if the path generation is already running alongside it
+                await asyncio.wait_for(path_generation_started.wait(), timeout=1)
+                return {"tool_calls": [{
+                    "name": "evaluate_and_summarize_subtree",
+                    "arguments": {
+                        "requirements_met": True,
+                        "summary": "Done.",
+                        "check_requirement_one_by_one": "All satisfied",
+                        "deliverable_output_path": ["$.root_output"]
+                    }
+                }]}
+
+            engine.json_path_generator.generate_output_json_path = generate_output_json_path
+            engine.tools["LLM"].execute = AsyncMock(side_effect=evaluate)
+            return await engine._compact_subtree("root")
+
+        self.assertTrue(asyncio.run(run()))
+        self.assertEqual(engine.context["compacted_result"]["summary"], "Done.")
+
+    @patch.object(DocExecuteEngine, "_evaluate_subtree_completion", new_callable=AsyncMock)
+    def test_compact_subtree_reads_outputs_written_directly_to_context(self, mock_evaluate):
+        """Compaction reads outputs from the live context, however they were written."""
+        engine = DocExecuteEngine(enable_tracing=False)
+        engine.completed_tasks = {
+            "root": Task(task_id="root", description="Produce final answer", sop_doc_id="dummy/root",
+                         tool={"tool_id": "LLM"}, input_json_path={}, output_json_path="$.root_output"),
+            "child": Task(task_id="child", description="Gather details", sop_doc_id="dummy/child",
+                          tool={"tool_id": "LLM"}, input_json_path={}, output_json_path="$.child_output",
+                          parent_task_id="root"),
+        }
+        engine.context = {"root_output": "new draft", "child_output": {"text": "new details"}}
+        engine.json_path_generator.generate_output_json_path = AsyncMock(return_value="$.compacted")
+        mock_evaluate.return_value = (False, [], [], {})
+        asyncio.run(engine._compact_subtree("root"))
+        self.assertEqual(mock_evaluate.await_args.args[1],
+                         {"$.root_output": "new draft", "$.child_output": {"text": "new details"}})
+
+        # Values written in place are read from the live context as well
+        engine.context["child_output"]["text"] = "live details"
+        asyncio.run(engine._compact_subtree("root"))
+        self.assertEqual(mock_evaluate.await_args.args[1]["$.child_output"], {"text": "live details"})
 
     @patch.object(DocExecuteEngine, "_attempt_subtree_compaction", new_callable=AsyncMock)
     @patch.object(DocExecuteEngine, "parse_new_tasks_from_output", new_callable=AsyncMock)
@@ -651,6 +928,71 @@ class TestDocExecuteEngineUnits(unittest.TestCase):
         called_params = engine.tools["LLM"].execute.await_args.args[0]
         self.assertEqual(called_params["prompt"], "Do: Test task description")
 
+    @patch.object(DocExecuteEngine, "_attempt_subtree_compaction", new_callable=AsyncMock)
+    def test_execute_task_context_after_snapshot_matches_live_context(self, mock_compaction):
+        """The traced context_after snapshot equals the live context after a nested output write"""
+        with tempfile.TemporaryDirectory() as trace_dir:
+            engine = DocExecuteEngine(enable_tracing=True, trace_output_dir=trace_dir)
+            engine.context = {
+                "current_task": "Summarize",
+                "notes": {"existing": [1, 2]},
+                "untouched": {"items": ["a"]},
+                "_temp_input_abc": "temp",
+            }
+            engine._temp_input_keys = {"_temp_input_abc"}
+
+            phase_data = {}
+
+            @contextmanager
+            def record_phase(phase_name):
+                phase_ctx = MagicMock()
+                phase_ctx.set_data.side_effect = lambda data: phase_data.setdefault(phase_name, data)
+                yield phase_ctx
+
+            engine.tracer.trace_phase_with_data = record_phase
+
+            task = Task(
+                task_id="nested_output",
+                description="Summarize",
+                sop_doc_id="dummy/nested_output",
+                tool={"tool_id": "LLM", "parameters": {"prompt": "Do: {task_description}"}},
+                input_json_path={},
+                output_json_path="$.notes.summary",
+                output_description="Summary",
+                skip_new_task_generation=True,
+            )
+            engine.sop_loader.load_sop_document = MagicMock(return_value=MagicMock(body=""))
+            engine.tools["LLM"].execute = AsyncMock(return_value={"content": "ok"})
+            mock_compaction.return_value = False
+
+            asyncio.run(engine.execute_task(task))
+
+            context_update = phase_data["context_update"]
+            self.assertEqual(context_update["context_after"], engine.context)
+            self.assertEqual(list(context_update["context_after"]), list(engine.context))
+            self.assertNotIn("summary", context_update["context_before"]["notes"])
+            self.assertIn("_temp_input_abc", context_update["context_before"])
+            self.assertIsNot(context_update["context_after"]["notes"], engine.context["notes"])
+
+    def test_create_task_from_sop_leaves_the_sop_document_unchanged(self):
+        """Generated input paths go on the task, not on the cached SOP document"""
+        engine = DocExecuteEngine(enable_tracing=False)
+        engine.context = {"_temp_input_abc": "generated"}
+        sop_doc = SOPDocument(
+            doc_id="tools/llm", description="LLM", aliases=[], tool={"tool_id": "LLM"},
+            input_json_path={"prompt": "$.prompt"}, output_json_path="", body="", parameters={},
+            input_description={"prompt": "Prompt", "topic": "Topic"}, output_description="",
+            result_validation_rule="",
+        )
+        engine.json_path_generator.generate_input_json_paths = AsyncMock(
+            return_value={"topic": "$._temp_input_abc"}
+        )
+
+        task = asyncio.run(engine.create_task_from_sop(sop_doc, PendingTask(description="Write")))
+
+        self.assertEqual(task.input_json_path["topic"], "$._temp_input_abc")
+        self.assertEqual(sop_doc.input_json_path, {"prompt": "$.prompt"})
+
     @patch.object(DocExecuteEngine, "_attempt_subtree_compaction", new_callable=AsyncMock)
     def test_execute_task_renders_implicit_current_task_without_input_json_path(self, mock_compaction):
         # Case A: uses engine.context["current_task"]
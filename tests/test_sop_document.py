@@ -172,6 +172,19 @@ This document has no parameters sections.
         self.assertIn("Extra Section", doc.parameters)
         self.assertFalse(doc.requires_planning_metadata)
     
+    def test_load_document_is_cached_until_file_changes(self):
+        """Test repeated loads reuse the parsed document and see file edits"""
+        doc = self.loader.load_sop_document("basic")
+
+        with patch("sop_document.yaml.safe_load", side_effect=AssertionError("re-parsed")):
+            reloaded = self.loader.load_sop_document("basic")
+        self.assertIs(reloaded, doc)
+
+        doc_path = self.docs_dir / "basic.md"
+        doc_path.write_text(doc_path.read_text().replace("Basic test document", "Edited document"))
+        os.utime(doc_path, ns=(doc_path.stat().st_atime_ns, doc_path.stat().st_mtime_ns + 1_000_000))
+        self.assertEqual(self.loader.load_sop_document("basic").description, "Edited document")
+
     def test_load_nonexistent_document(self):
         """Test loading a non-existent document"""
         with self.assertRaises(FileNotFoundError):
@@ -400,6 +413,18 @@ requires_planning_metadata: true
         empty_parser = SOPDocumentParser("/nonexistent/path")
         doc_ids = empty_parser._get_all_doc_ids()
         self.assertEqual(doc_ids, [])
+
+    def test_doc_registry_is_cached_until_refresh(self):
+        """Doc IDs are scanned once per parser; refresh_doc_registry picks up new files"""
+        doc_ids = self.parser._get_all_doc_ids()
+
+        with open(self.docs_dir / "general" / "added_later.md", 'w') as f:
+            f.write("---\ndescription: Added after first scan\n---\nBody")
+
+        self.assertEqual(self.parser._get_all_doc_ids(), doc_ids)
+
+        self.parser.refresh_doc_registry()
+        self.assertIn("general/added_later", self.parser._get_all_doc_ids())
     
     def test_plan_document_requires_metadata_flag(self):
         """Ensure plan SOP is marked for planning metadata injection."""
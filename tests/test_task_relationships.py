@@ -11,8 +11,10 @@ import pytest
 from unittest.mock import patch, MagicMock
 import uuid
 import re
+from dataclasses import asdict
 
 from doc_execute_engine import DocExecuteEngine, Task, PendingTask
+from exceptions import TaskCreationError, TaskInputMissingError
 from tracing import ExecutionTracer
 
 
@@ -29,7 +31,7 @@ class TestTaskRelationships:
         pending_task = PendingTask(description="Test task description")
         # Verify auto-generated fields (deterministic hash id)
         assert pending_task.task_id is not None
-        assert len(pending_task.task_id) == 16  # First 16 hex chars of sha1
+        assert len(pending_task.task_id) == 16  # 8-byte blake2b digest as hex
         assert re.fullmatch(r"[0-9a-f]{16}", pending_task.task_id)
         assert pending_task.short_name == "Test task description"
         assert pending_task.parent_task_id is None
@@ -62,6 +64,16 @@ class TestTaskRelationships:
         
         print("✅ PendingTask parent-child relationships work correctly")
 
+    def test_pending_task_to_dict_matches_asdict(self):
+        """Test PendingTask.to_dict produces the same payload as dataclasses.asdict"""
+        pending_task = PendingTask(
+            description="Child task",
+            parent_task_id="parent-id",
+            generated_by_phase="new_task_generation"
+        )
+
+        assert pending_task.to_dict() == asdict(pending_task)
+
     def test_task_with_enhanced_fields(self):
         """Test Task class with new relationship fields"""
         task = Task(
@@ -114,6 +126,34 @@ class TestTaskRelationships:
         
         print("✅ Engine task stack with PendingTask objects works correctly")
 
+    def test_add_new_tasks_rejects_batches_beyond_max_stack_depth(self):
+        """A batch that would overflow max_stack_depth is rejected before touching the stack"""
+        self.engine.max_stack_depth = 2
+        asyncio.run(self.engine.add_new_tasks([PendingTask(description="First task")]))
+
+        with pytest.raises(RuntimeError, match="max_stack_depth=2"):
+            asyncio.run(self.engine.add_new_tasks([PendingTask(description="Second task"), PendingTask(description="Third task")]))
+        assert len(self.engine.task_stack) == 1
+
+        self.engine.max_stack_depth = None
+        asyncio.run(self.engine.add_new_tasks([PendingTask(description="Second task"), PendingTask(description="Third task")]))
+        assert len(self.engine.task_stack) == 3
+
+    @pytest.mark.asyncio
+    async def test_recovery_tasks_respect_max_stack_depth(self):
+        """Recovery pushes go through the same max_stack_depth check as new tasks"""
+        self.engine.max_stack_depth = 1
+        recovery_task = PendingTask(description="Ask the user for the report topic")
+
+        with patch.object(self.engine, 'create_task_from_description',
+                          side_effect=TaskInputMissingError("report_topic", "Topic of the report")), \
+             patch.object(self.engine, 'generate_recovery_task', return_value=recovery_task):
+            with pytest.raises(RuntimeError, match="max_stack_depth=1"):
+                await self.engine.start("Write a report")
+
+        # The failed task went back on the stack; its recovery task did not fit
+        assert [pending.description for pending in self.engine.task_stack] == ["Write a report"]
+
     def test_engine_state_with_pending_tasks(self):
         """Test _get_engine_state method with PendingTask objects"""
         # Clear task stack first
@@ -194,6 +234,9 @@ class TestTaskRelationships:
             ]
         }
         
+        # The output carries no tag, so extraction only runs when always parsing
+        self.engine.always_llm_parse = True
+
         # Mock LLM tool
         with patch.object(self.engine.tools["LLM"], 'execute') as mock_llm:
             mock_llm.return_value = mock_response
@@ -213,6 +256,52 @@ class TestTaskRelationships:
         
         print("✅ parse_new_tasks_from_output returns PendingTask objects correctly")
 
+    @pytest.mark.asyncio
+    async def test_parse_new_tasks_skips_llm_without_tags_by_default(self):
+        """By default, only outputs without any tag skip the extraction call"""
+        parent_task = Task(
+            task_id="parent-id",
+            description="Parent task",
+            sop_doc_id="tools/llm",
+            tool={"tool_id": "LLM"},
+            input_json_path={},
+            output_json_path="$.output"
+        )
+        assert self.engine.always_llm_parse is False
+
+        with patch.object(self.engine.tools["LLM"], 'execute') as mock_llm:
+            mock_llm.return_value = {"tool_calls": [{"name": "extract_new_tasks", "arguments": {"tasks": ["Task 1"]}}]}
+
+            assert await self.engine.parse_new_tasks_from_output({"stdout": "done", "returncode": 0}, parent_task) == []
+            mock_llm.assert_not_called()
+
+            # A tag that clipping would cut out of the prompt still counts
+            self.engine.task_parse_max_field_chars = 20
+            output = "a" * 50 + "<follow_up>Write the report</follow_up>" + "b" * 50
+            new_pending_tasks = await self.engine.parse_new_tasks_from_output(output, parent_task)
+            assert [pending_task.description for pending_task in new_pending_tasks] == ["Task 1"]
+
+    @pytest.mark.asyncio
+    async def test_parse_new_tasks_renders_list_output_one_item_per_line(self):
+        """List outputs reach the extraction prompt as lines, not as a Python repr"""
+        parent_task = Task(
+            task_id="parent-id",
+            description="Parent task",
+            sop_doc_id="tools/llm",
+            tool={"tool_id": "LLM"},
+            input_json_path={},
+            output_json_path="$.output"
+        )
+
+        with patch.object(self.engine.tools["LLM"], 'execute') as mock_llm:
+            mock_llm.return_value = {"tool_calls": []}
+
+            await self.engine.parse_new_tasks_from_output(["<task>Write tests</task>", "done"], parent_task)
+
+            prompt = mock_llm.call_args[0][0]["prompt"]
+            assert "<task>Write tests</task>\ndone" in prompt
+            assert "['<task>" not in prompt
+
     @pytest.mark.asyncio 
     async def test_initial_task_creates_pending_task(self):
         """Test that start() method creates PendingTask for initial task"""
@@ -247,6 +336,32 @@ class TestTaskRelationships:
         
         print("✅ Initial task creates PendingTask correctly")
 
+    @pytest.mark.asyncio
+    async def test_same_missing_field_after_recovery_fails_without_new_recovery(self):
+        """A field still missing after its recovery task ran fails instead of asking the LLM again"""
+        initial_description = "Write a report"
+
+        async def create_task(pending_task):
+            if pending_task.description == initial_description:
+                raise TaskInputMissingError("report_topic", "Topic of the report")
+            return Task(
+                task_id=pending_task.task_id,
+                description=pending_task.description,
+                sop_doc_id="general/fallback",
+                tool={"tool_id": "LLM"},
+                input_json_path={},
+                output_json_path="$.output"
+            )
+
+        recovery_task = PendingTask(description="Ask the user for the report topic")
+        with patch.object(self.engine, 'create_task_from_description', side_effect=create_task), \
+             patch.object(self.engine, 'run_task', return_value=[]), \
+             patch.object(self.engine, 'generate_recovery_task', return_value=recovery_task) as mock_recovery:
+            with pytest.raises(TaskCreationError):
+                await self.engine.start(initial_description)
+
+        mock_recovery.assert_called_once()
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -225,22 +225,20 @@ def extract_func(context):
         result = self.smart_generator._execute_extraction_code(code, context)
         self.assertEqual(result, "<NOT_FOUND_IN_CANDIDATES>")
     
-    @patch('builtins.print')
-    def test_execute_extraction_code_prints_errors(self, mock_print):
-        """Test that extraction code errors are printed"""
+    def test_execute_extraction_code_logs_errors(self):
+        """Test that extraction code errors are logged"""
         code = '''
 def extract_func(context):
     raise ValueError("Test error")
 '''
         context = {"name": "John"}
         
-        with self.assertRaises(ValueError):
-            self.smart_generator._execute_extraction_code(code, context)
+        with self.assertLogs("tools.json_path_generator", level="WARNING") as logs:
+            with self.assertRaises(ValueError):
+                self.smart_generator._execute_extraction_code(code, context)
         
-        # Should print error message
-        mock_print.assert_called()
-        error_call = [call for call in mock_print.call_args_list if "Error executing extraction code" in str(call)]
-        self.assertTrue(len(error_call) > 0)
+        # Should log error message
+        self.assertTrue(any("Error executing extraction code" in line for line in logs.output))
     
     @patch('tools.json_path_generator.OnebyOneJsonPathGenerator._generate_extraction_code')
     @patch('tools.json_path_generator.SmartJsonPathGenerator._analyze_context_candidates')
@@ -0,0 +1,128 @@
+import asyncio
+import json
+from pathlib import Path
+
+from tracing import ExecutionTracer, ExecutionStatus, _json_snapshot, _session_writer
+from doc_execute_engine import PendingTask
+
+
+def test_session_file_is_complete_when_session_ends(tmp_path):
+    tracer = ExecutionTracer(output_dir=str(tmp_path))
+    tracer.start_session("root task")
+
+    pending_task = PendingTask(description="root task")
+    for _ in range(5):
+        tracer.start_task_execution(pending_task, {"task_execution_counter": 0})
+        tracer.start_phase("task_execution")
+        tracer.end_phase()
+        tracer.end_task_execution({"task_execution_counter": 1}, ExecutionStatus.COMPLETED)
+
+    filename = tracer.end_session(ExecutionStatus.COMPLETED)
+
+    with open(filename, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["final_status"] == "completed"
+    assert len(data["task_executions"]) == 5
+    assert data["task_executions"][-1]["phases"]["task_execution"]["status"] == "completed"
+
+
+def test_flush_threshold_batches_phase_writes(tmp_path):
+    tracer = ExecutionTracer(output_dir=str(tmp_path), flush_threshold=100)
+    tracer.start_session("root task")
+    tracer.start_task_execution(PendingTask(description="root task"), {"task_execution_counter": 0})
+    tracer.start_phase("task_execution")
+    tracer.end_phase()
+
+    def saved_task_count():
+        _session_writer.flush()
+        with open(tracer.current_session_file, encoding="utf-8") as f:
+            return len(json.load(f)["task_executions"])
+
+    # Only the session start has been written so far
+    assert saved_task_count() == 0
+
+    tracer.end_task_execution({"task_execution_counter": 1}, ExecutionStatus.COMPLETED)
+    assert saved_task_count() == 1
+    tracer.end_session(ExecutionStatus.COMPLETED)
+
+
+def test_task_end_writes_the_session_file_in_place(tmp_path):
+    tracer = ExecutionTracer(output_dir=str(tmp_path), flush_threshold=100)
+    tracer.start_session("root task")
+    tracer.start_task_execution(PendingTask(description="root task"), {"task_execution_counter": 0})
+    tracer.end_task_execution({"task_execution_counter": 1}, ExecutionStatus.COMPLETED)
+
+    # Written before end_task_execution returns, through a temp file that is renamed over the trace
+    with open(tracer.current_session_file, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["task_executions"][0]["status"] == "completed"
+    assert [path.name for path in tmp_path.iterdir()] == [Path(tracer.current_session_file).name]
+    tracer.end_session(ExecutionStatus.COMPLETED)
+
+
+def test_json_snapshot_copies_and_normalizes_like_json():
+    value = {"nested": {"items": (1, 2)}, 3: "int key"}
+    snapshot = _json_snapshot(value)
+    assert snapshot == json.loads(json.dumps(value))
+    value["nested"]["new"] = True
+    assert "new" not in snapshot["nested"]
+
+    # Values orjson rejects fall back to the stdlib encoder
+    assert _json_snapshot({"wide": 2 ** 70}) == {"wide": 2 ** 70}
+
+
+def test_concurrent_steps_keep_their_own_llm_call_storage(tmp_path):
+    tracer = ExecutionTracer(output_dir=str(tmp_path))
+    tracer.start_session("root task")
+    tracer.start_task_execution(PendingTask(description="root task"), {"task_execution_counter": 0})
+    tracer.start_phase("task_creation")
+
+    async def extract(field_name):
+        with tracer.trace_input_field_extraction_step(field_name, field_name):
+            # Let the other step start before this one logs its call
+            await asyncio.sleep(0)
+            tracer.log_llm_call(prompt=f"find {field_name}", response=field_name)
+
+    async def run_both():
+        await asyncio.gather(extract("title"), extract("author"))
+
+    asyncio.run(run_both())
+
+    extractions = tracer.current_task_execution.phases["task_creation"].input_field_extractions
+    assert extractions["title"].context_analysis_call.prompt == "find title"
+    assert extractions["author"].context_analysis_call.prompt == "find author"
+    assert tracer._context.current_sub_step is None
+    tracer.end_phase()
+    tracer.end_session(ExecutionStatus.COMPLETED)
+
+
+def test_tracers_keep_separate_step_state(tmp_path):
+    tracers = [ExecutionTracer(output_dir=str(tmp_path)) for _ in range(2)]
+    for tracer in tracers:
+        tracer.start_session("root task")
+        tracer.start_task_execution(PendingTask(description="root task"), {"task_execution_counter": 0})
+        tracer.start_phase("task_creation")
+
+    first, second = tracers
+    with first.trace_input_field_extraction_step("title", "title"):
+        assert first._context.current_field_name == "title"
+        assert second._context.current_field_name is None
+        with second.trace_input_field_extraction_step("author", "author"):
+            assert first._context.current_field_name == "title"
+            assert second._context.current_field_name == "author"
+        assert second._context.current_field_name is None
+    assert first._context.current_field_name is None
+
+    for tracer in tracers:
+        tracer.end_phase()
+        tracer.end_session(ExecutionStatus.COMPLETED)
+
+
+def test_json_snapshot_stringifies_values_json_cannot_represent():
+    class Opaque:
+        def __str__(self):
+            return "opaque"
+
+    assert _json_snapshot({"obj": Opaque(), "raw": b"bytes"}) == {"obj": "opaque", "raw": "b'bytes'"}
+    # The stdlib fallback stringifies as well
+    assert _json_snapshot({"wide": 2 ** 70, "obj": Opaque()}) == {"wide": 2 ** 70, "obj": "opaque"}
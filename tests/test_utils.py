@@ -3,7 +3,7 @@ import unittest
 import sys
 import os
 
-from utils import set_json_path_value, get_json_path_value, extract_key_from_json_path
+from utils import set_json_path_value, get_json_path_value, extract_key_from_json_path, is_simple_json_path, compile_json_path
 
 
 class TestUtils(unittest.TestCase):
@@ -151,6 +151,39 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(get_json_path_value(data, "$.active"), True)
         self.assertIsNone(get_json_path_value(data, "$.empty"))
 
+    def test_get_json_path_value_simple_path_matches_jsonpath(self):
+        """Test the direct-walk fast path agrees with jsonpath_ng semantics"""
+        data = {"a": {"b": [1, {"c": 2}]}, "s": "hi", "l": [1, 2], "d": {"0": "x"}}
+        self.assertEqual(get_json_path_value(data, "$.a.b[1].c"), 2)
+        self.assertEqual(get_json_path_value(data, "$.a.b[0]"), 1)
+        self.assertEqual(get_json_path_value(data, "$.s[0]"), "h")
+        self.assertIsNone(get_json_path_value(data, "$.a.b[5]"))
+        self.assertIsNone(get_json_path_value(data, "$.a.b[0].c"))
+        self.assertIsNone(get_json_path_value(data, "$.l.x"))
+        self.assertIsNone(get_json_path_value(data, "$.d[0]"))
+
+        hyphenated = {"step-1": {"raw-output": ["x"]}}
+        self.assertTrue(is_simple_json_path("$.step-1.raw-output[0]"))
+        self.assertEqual(get_json_path_value(hyphenated, "$.step-1.raw-output[0]"), "x")
+        self.assertEqual(get_json_path_value(hyphenated, "$.step-1.raw-output[0]"),
+                         compile_json_path("$.step-1.raw-output[0]").find(hyphenated)[0].value)
+
+    def test_is_simple_json_path(self):
+        """Test detection of paths eligible for the fast path"""
+        self.assertTrue(is_simple_json_path("$.a"))
+        self.assertTrue(is_simple_json_path("$.a.b[0]._c"))
+        self.assertFalse(is_simple_json_path("$"))
+        self.assertFalse(is_simple_json_path("$..a"))
+        self.assertFalse(is_simple_json_path("$.a[*]"))
+        self.assertFalse(is_simple_json_path("$.a[?(@.b)]"))
+        self.assertFalse(is_simple_json_path("$.['a b']"))
+
+    def test_compile_json_path_reuses_parsed_expression(self):
+        """Test repeated paths share one compiled expression"""
+        expr = compile_json_path("$.items[*].name")
+        self.assertIs(compile_json_path("$.items[*].name"), expr)
+        self.assertEqual([m.value for m in expr.find({"items": [{"name": "a"}, {"name": "b"}]})], ["a", "b"])
+
     def test_get_json_path_value_invalid_path(self):
         """Test getting value with invalid path returns None"""
         data = {"title": "My Title"}
@@ -18,12 +18,15 @@ limitations under the License.
 """
 
 import asyncio
+import logging
 import os
 from typing import Dict, Any, Optional, List, Set
 
 from .base_tool import BaseTool
 from .llm_tool import LLMTool
 
+logger = logging.getLogger(__name__)
+
 
 class CLITool(BaseTool):
     """Command Line Interface tool for executing shell commands.
@@ -78,8 +81,10 @@ class CLITool(BaseTool):
             generated_command = self._extract_command_from_response(response)
             explicit_command = generated_command
 
-        print(f"[CLI CALL] Command: {explicit_command}")
+        logger.info("[CLI CALL] Command: %s", explicit_command)
 
+        # Keep this on asyncio's subprocess API; subprocess.run would block the event loop
+        # (and every in-flight LLM call) for the whole duration of the command.
         process = await asyncio.create_subprocess_shell(
             explicit_command,
             executable="bash",
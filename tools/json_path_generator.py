@@ -19,6 +19,7 @@ limitations under the License.
 
 import json
 import asyncio
+import logging
 import re
 from typing import Dict, Any, Optional, Tuple
 import uuid
@@ -33,6 +34,12 @@ from tools import LLMTool
 from tools.retry_strategies import SimpleRetryStrategy, AppendValidationHintStrategy
 from utils.json_utils import get_json_path_value
 
+# Fenced blocks pulled out of LLM responses by the validators below
+_JSON_FENCE_RE = re.compile(r"```json\s*(.*?)\s*```", re.DOTALL)
+_PYTHON_FENCE_RE = re.compile(r"```python\n(.*?)\n```", re.DOTALL)
+
+logger = logging.getLogger(__name__)
+
 
 class BaseJsonPathGenerator:
     """Base class providing shared logic for JSON path generation using LLM"""
@@ -119,7 +126,7 @@ Peak value in each key:
                 raise ValueError("Duplicate keys were generated. Please ensure all new keys are unique.")
 
         if not self.llm_tool:
-            print("[JSON_PATH_GEN] Warning: LLM tool not available for shortening keys. Returning original keys.")
+            logger.warning("[JSON_PATH_GEN] LLM tool not available for shortening keys. Returning original keys.")
             return key_value_pairs
 
 
@@ -135,14 +142,14 @@ Peak value in each key:
 
         tool_calls = response.get("tool_calls", [])
         if not tool_calls or tool_calls[0].get("name") != "shorten_keys":
-            print("[JSON_PATH_GEN] Warning: Failed to get shortened keys from LLM. Returning original keys.")
+            logger.warning("[JSON_PATH_GEN] Failed to get shortened keys from LLM. Returning original keys.")
             return key_value_pairs
 
         key_map = tool_calls[0].get("arguments", {})
         
         new_key_value_pairs = {key_map.get(old_key, old_key): value for old_key, value in key_value_pairs.items()}
         
-        print(f"[JSON_PATH_GEN] Shortened/processed keys: {key_map}")
+        logger.debug("[JSON_PATH_GEN] Shortened/processed keys: %s", key_map)
         return new_key_value_pairs
 
 
@@ -207,7 +214,7 @@ Peak value in each key:
         arguments = tool_call.get("arguments", {})
         path = arguments.get("output_path", "$.output")
 
-        print(f"[JSON_PATH_GEN] Generated output path: {path}")
+        logger.info("[JSON_PATH_GEN] Generated output path: %s", path)
         return path
     
     def _generate_context_schema(self, context: Dict[str, Any], context_key_meaning_map: Optional[Dict[str, str]] = None) -> str:
@@ -317,10 +324,10 @@ Analyze the current context to find fields that might contain information for th
             response_content = resp.get("content", "")
             json_block_text = response_content
             if "```json" in response_content:
-                json_block_match = re.search(r"```json\s*(.*?)\s*```", response_content, re.DOTALL)
+                json_block_match = _JSON_FENCE_RE.search(response_content)
                 if not json_block_match:
                     raise ValueError("Response does not contain valid JSON array block when using regex to search: re.search(r\"```json\s*(.*?)\s*```\", content, re.DOTALL) ")
-                json_block_text = json_block_match.group(1).strip()
+                json_block_text = json_block_match.group(1)
             
             candidate_array = json.loads(json_block_text)
             if not isinstance(candidate_array, list):
@@ -358,7 +365,7 @@ Analyze the current context to find fields that might contain information for th
 
         candidates_objects = parse_candidate_object(response)
 
-        print(f"[JSON_PATH_GEN] Found candidates for '{input_description}': {candidates_objects}")
+        logger.debug("[JSON_PATH_GEN] Found candidates for '%s': %s", input_description, candidates_objects)
         return candidates_objects            
 
 
@@ -384,12 +391,12 @@ Analyze the current context to find fields that might contain information for th
             extraction_func = functions.popitem()[1]
             result = extraction_func(context)
             
-            print(f"[JSON_PATH_GEN] Extracted content: {result}")
+            logger.debug("[JSON_PATH_GEN] Extracted content: %s", result)
             return result
             
         except Exception as e:
-            print(f"[JSON_PATH_GEN] Error executing extraction code: {e}")
-            print(f"[JSON_PATH_GEN] Code was: {code}")
+            logger.warning("[JSON_PATH_GEN] Error executing extraction code: %s", e)
+            logger.debug("[JSON_PATH_GEN] Code was: %s", code)
             # Fallback: return a default value
             raise e
 
@@ -402,7 +409,7 @@ Analyze the current context to find fields that might contain information for th
         temp_keys = [key for key in context.keys() if key.startswith('_temp_input_')]
         for key in temp_keys:
             del context[key]
-        print(f"[JSON_PATH_GEN] Cleaned up {len(temp_keys)} temporary input keys")
+        logger.debug("[JSON_PATH_GEN] Cleaned up %s temporary input keys", len(temp_keys))
     
     def _create_output_path_tool_schema(self) -> Dict[str, Any]:
         """Create tool schema for generating output JSON path
@@ -616,8 +623,8 @@ def extract_func(context):
         # Validator for generated python code block
         def _code_validator(resp: Dict[str, Any]):
             content = resp.get("content", "")
-            print(f"[JSON_PATH_GEN] Think process for '{input_description}': \n{content}")
-            m = re.search(r'```python\n(.*?)\n```', content, re.DOTALL)
+            logger.debug("[JSON_PATH_GEN] Think process for '%s': \n%s", input_description, content)
+            m = _PYTHON_FENCE_RE.search(content)
             if not m:
                 raise ValueError("Response does not contain valid Python code block")
             code_candidate = m.group(1).strip()
@@ -639,7 +646,7 @@ def extract_func(context):
             retry_llm_tool=self.llm_tool,
         )
         code = response.get('__validated_extraction_code')
-        print(f"[JSON_PATH_GEN] Generated extraction code for '{input_description}': {code}")
+        logger.debug("[JSON_PATH_GEN] Generated extraction code for '%s': %s", input_description, code)
         return code
 
     async def generate_input_json_paths(
@@ -702,10 +709,11 @@ def extract_func(context):
                     # Create JSON path for the temporary key
                     result_paths[field_name] = f"$.['{temp_key}']"
 
-                    print(f"[JSON_PATH_GEN] Generated input for '{field_name}': {extracted_content}")
-
-                    print("Current context after processing:")
-                    print(json.dumps(context, ensure_ascii=False, indent=2))
+                    logger.debug("[JSON_PATH_GEN] Generated input for '%s': %s", field_name, extracted_content)
+                    # Dumping the whole context is the expensive part; only pay for it when shown
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("[JSON_PATH_GEN] Current context after processing:\n%s",
+                                     json.dumps(context, ensure_ascii=False, indent=2, default=str))
 
                     # Set successful data in context (no-op if tracing disabled)
                     input_ctx.set_result(
@@ -715,7 +723,7 @@ def extract_func(context):
                         generated_path=f"$.['{temp_key}']"
                     )
 
-        print(f"[JSON_PATH_GEN] Generated input paths: {result_paths}")
+        logger.info("[JSON_PATH_GEN] Generated input paths: %s", result_paths)
         return result_paths
 
 
@@ -790,7 +798,7 @@ class BatchJsonPathGenerator(BaseJsonPathGenerator):
                     result_paths[field_name] = json_path
                     generated_paths[field_name] = json_path
 
-                    print(f"[SIMPLE_JSON_PATH_GEN] Generated input for '{field_name}': {extracted_content}")
+                    logger.debug("[SIMPLE_JSON_PATH_GEN] Generated input for '%s': %s", field_name, extracted_content)
             
             # Set successful data in tracer context (no-op if tracer disabled)
             batch_ctx.set_result(
@@ -800,7 +808,7 @@ class BatchJsonPathGenerator(BaseJsonPathGenerator):
                 generated_paths=generated_paths
             )
         
-        print(f"[SIMPLE_JSON_PATH_GEN] Generated input paths: {result_paths}")
+        logger.info("[SIMPLE_JSON_PATH_GEN] Generated input paths: %s", result_paths)
         return result_paths
     
     def _create_extraction_tool_schema(self, input_descriptions: Dict[str, str]) -> Dict[str, Any]:
@@ -912,7 +920,7 @@ Context object is a dictionary, here we represent them using json_path syntax:
         # Extract arguments
         arguments = tool_call.get("arguments", {})
         
-        print(f"[SIMPLE_JSON_PATH_GEN] LLM extracted fields: {arguments}")
+        logger.debug("[SIMPLE_JSON_PATH_GEN] LLM extracted fields: %s", arguments)
         
         # Ensure all required fields are present
         result = {}
@@ -1059,7 +1067,7 @@ class SmartJsonPathGenerator(BaseJsonPathGenerator):
         # 1. If len(input_descriptions) == 1, use OneByOneJsonPathGenerator
         # 2. Others use BatchJsonPathGenerator
         if len(input_descriptions) == 1:
-            print(f"[SMART_JSON_PATH_GEN] Using OneByOneJsonPathGenerator for single input")
+            logger.debug("[SMART_JSON_PATH_GEN] Using OneByOneJsonPathGenerator for single input")
             return await self.one_by_one_generator.generate_input_json_paths(
                 input_descriptions,
                 context,
@@ -1069,7 +1077,7 @@ class SmartJsonPathGenerator(BaseJsonPathGenerator):
                 task_short_name=task_short_name
             )
         else:
-            print(f"[SMART_JSON_PATH_GEN] Using BatchJsonPathGenerator for {len(input_descriptions)} inputs")
+            logger.debug("[SMART_JSON_PATH_GEN] Using BatchJsonPathGenerator for %s inputs", len(input_descriptions))
             return await self.batch_generator.generate_input_json_paths(
                 input_descriptions,
                 context,
@@ -22,12 +22,15 @@ import asyncio
 import os
 import copy
 import inspect
+import logging
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List, Callable, Tuple
 from openai import AsyncOpenAI
 
 from .base_tool import BaseTool
 
+logger = logging.getLogger(__name__)
+
 
 class LLMTool(BaseTool):
     """Large Language Model tool for generating text and structured responses"""
@@ -38,10 +41,13 @@ class LLMTool(BaseTool):
 
         api_key = os.getenv("OPENAI_API_KEY", "")
         base_url = os.getenv("OPENAI_API_BASE", "https://openrouter.ai/api/v1")
+        # Transport-level retries (429 / 5xx / connection errors) with the client's jittered backoff
+        max_retries = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
         
         self.client = AsyncOpenAI(
             base_url=base_url,
-            api_key=api_key
+            api_key=api_key,
+            max_retries=max_retries
         )
         self.model = os.getenv("OPENAI_MODEL", "openai/gpt-4o-2024-11-20")  
 
@@ -104,7 +110,7 @@ class LLMTool(BaseTool):
                 except Exception as ve:
                     last_error = ve
                     last_response = response
-                    print(f"[LLM RETRY] Validation failed (strategy={strategy.name()} attempt={attempt}/{total_attempts}): {ve}")
+                    logger.warning("[LLM RETRY] Validation failed (strategy=%s attempt=%s/%s): %s", strategy.name(), attempt, total_attempts, ve)
                     continue
 
         if last_error:
@@ -120,9 +126,9 @@ class LLMTool(BaseTool):
 
         call_start_time = self._current_time()
 
-        print(f"[LLM CALL] Prompt: {prompt}...")
-        if tools:
-            print(f"[LLM CALL] Tools provided: {[tool.get('function', {}).get('name', 'unknown') for tool in tools]}")
+        logger.debug("[LLM CALL] Prompt: %s...", prompt)
+        if tools and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[LLM CALL] Tools provided: %s", [tool.get('function', {}).get('name', 'unknown') for tool in tools])
 
         call_model = parameters.get('model', self.model)
         api_params = {
@@ -152,14 +158,14 @@ class LLMTool(BaseTool):
         )
 
         if tools and not tool_calls:
-            print("[LLM FALLBACK] No native tool calls returned. Attempting XML JSON fallback.")
+            logger.warning("[LLM FALLBACK] No native tool calls returned. Attempting XML JSON fallback.")
             fallback_prompt = prompt + self._build_fallback_tool_instructions(tools)
             api_params_fallback = dict(api_params)
             api_params_fallback["messages"] = [
                 {"role": "user", "content": fallback_prompt}
             ]
             api_params_fallback["tools"] = None
-            print(f"[LLM FALLBACK] New Prompt: \n-----{fallback_prompt}...")
+            logger.debug("[LLM FALLBACK] New Prompt: \n-----%s...", fallback_prompt)
             # Re-issue call
             fallback_start_time = self._current_time()
             stream_fb = await self.client.chat.completions.create(**api_params_fallback)
@@ -167,12 +173,12 @@ class LLMTool(BaseTool):
             fallback_end_time = self._current_time()
             parsed_calls = self._parse_xml_wrapped_tool_json(content_fb, tools)
             if parsed_calls:
-                print(f"[LLM FALLBACK] Parsed {len(parsed_calls)} tool call(s) from XML fallback.")
+                logger.info("[LLM FALLBACK] Parsed %s tool call(s) from XML fallback.", len(parsed_calls))
                 content = content_fb
                 tool_calls = parsed_calls
                 token_usage = fb_usage
             else:
-                print("[LLM FALLBACK] Failed to parse XML fallback output.")
+                logger.warning("[LLM FALLBACK] Failed to parse XML fallback output.")
                 # Even if parsing failed, keep the raw content for logging visibility
                 content = content_fb
                 tool_calls = []
@@ -189,12 +195,12 @@ class LLMTool(BaseTool):
                 all_parameters=parameters
             )
 
-        print(f"[LLM RESPONSE] {content[:100]}...")
-        if tool_calls:
-            print(f"[TOOL CALLS] Collected {len(tool_calls)} tool calls:")
+        logger.debug("[LLM RESPONSE] %s...", content[:100])
+        if tool_calls and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[TOOL CALLS] Collected %s tool calls:", len(tool_calls))
             for tool_call in tool_calls:
-                print(f"  - Tool: {tool_call.get('name', 'unknown')}")
-                print(f"    Arguments: {tool_call.get('arguments', {})}")
+                logger.debug("  - Tool: %s", tool_call.get('name', 'unknown'))
+                logger.debug("    Arguments: %s", tool_call.get('arguments', {}))
         return {
             "content": content,
             "tool_calls": tool_calls,
@@ -256,19 +262,19 @@ class LLMTool(BaseTool):
             List with a single tool_call dict or empty list if not found / parse error.
         """
         if not tools or not isinstance(tools, (list, tuple)) or len(tools) == 0:
-            print("[FALLBACK PARSE ERROR] No tools provided for parsing.")
+            logger.warning("[FALLBACK PARSE ERROR] No tools provided for parsing.")
             return []
         first = tools[0]
         fn = first.get("function", {}) if isinstance(first, dict) else {}
         fn_name = fn.get("name", "tool_function")
         if not content or fn_name not in content:
-            print(f"[FALLBACK PARSE ERROR] Function name '{fn_name}' not found in content: \n---{content}\n---")
+            logger.warning("[FALLBACK PARSE ERROR] Function name '%s' not found in content: \n---%s\n---", fn_name, content)
             return []
         import re
         pattern = rf"<\s*{re.escape(fn_name)}\s*>(.*?)<\s*/\s*{re.escape(fn_name)}\s*>"
         match = re.search(pattern, content, flags=re.DOTALL | re.IGNORECASE)
         if not match:
-            print(f"[FALLBACK PARSE ERROR] No matching XML tags found for function '{fn_name}' in content.")
+            logger.warning("[FALLBACK PARSE ERROR] No matching XML tags found for function '%s' in content.", fn_name)
             return []
         inner = match.group(1).strip()
         # Some models may include code fences or stray tags, sanitize minimally
@@ -278,10 +284,10 @@ class LLMTool(BaseTool):
         try:
             args = json.loads(inner)
         except json.JSONDecodeError:
-            print(f"[FALLBACK PARSE ERROR] Failed to parse JSON from XML-wrapped content: {inner}")
+            logger.warning("[FALLBACK PARSE ERROR] Failed to parse JSON from XML-wrapped content: %s", inner)
             return []
         if not isinstance(args, dict):
-            print(f"[FALLBACK PARSE ERROR] Parsed arguments is not a JSON object: {args}")
+            logger.warning("[FALLBACK PARSE ERROR] Parsed arguments is not a JSON object: %s", args)
             return []
         return [{
             'id': 'fallback_xml_0',
@@ -407,8 +413,8 @@ class LLMTool(BaseTool):
                         'arguments': arguments
                     })
                 except json.JSONDecodeError as e:
-                    print(f"[TOOL CALL ERROR] Failed to parse arguments: {e}")
-                    print(f"Raw arguments: {tool_call['function']['arguments']}")
+                    logger.warning("[TOOL CALL ERROR] Failed to parse arguments: %s\nRaw arguments: %s",
+                                   e, tool_call['function']['arguments'])
         
         # Combine all content chunks into final content
         return ''.join(content_chunks), tool_calls, token_usage
@@ -432,7 +438,7 @@ class LLMTool(BaseTool):
         try:
             self._call_logger(payload)
         except Exception as exc:  # pragma: no cover - best-effort logging
-            print(f"[LLM CALL LOG] Warning: failed to emit call log: {exc}")
+            logger.warning("[LLM CALL LOG] Failed to emit call log: %s", exc)
     
     async def _test_connection(self) -> bool:
         """Test connection to the API endpoint"""
@@ -451,10 +457,8 @@ class LLMTool(BaseTool):
             _, _, _ = await self._collect_streaming_chunks_with_tools(stream)
             return True
         except Exception as e:
-            print(f"[LLM CONNECTION ERROR] {str(e)}")
-            # print stack trace for debugging
-            import traceback
-            traceback.print_exc()
+            # Log with the stack trace for debugging
+            logger.exception("[LLM CONNECTION ERROR] %s", e)
             return False
 
     def get_result_validation_hint(self) -> str:
@@ -18,9 +18,12 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import logging
 from typing import Dict, Any, Optional
 from .base_tool import BaseTool
 
+logger = logging.getLogger(__name__)
+
 
 class TemplateTool(BaseTool):
     """Template tool for f-string style content replacement"""
@@ -50,8 +53,8 @@ class TemplateTool(BaseTool):
         if template_content is None:
             raise ValueError("sop_doc_body is required")
         
-        print(f"[TEMPLATE CALL] Template length: {len(template_content)} characters")
-        print(f"[TEMPLATE CALL] Parameters: {list(parameters.keys())}")
+        logger.debug("[TEMPLATE CALL] Template length: %s characters", len(template_content))
+        logger.debug("[TEMPLATE CALL] Parameters: %s", list(parameters.keys()))
 
         # Create a copy of parameters without template_content for formatting
         format_params = {k: v for k, v in parameters.items() if k != 'template_content'}
@@ -63,7 +66,7 @@ class TemplateTool(BaseTool):
             used_var_names = {m.group(1) for m in re.finditer(r"\{([a-zA-Z_][a-zA-Z0-9_]*)\}", template_content)}
             used_vars = {k: v for k, v in format_params.items() if k in used_var_names}
 
-            print(f"[TEMPLATE RESULT] Formatted content length: {len(formatted_content)} characters")
+            logger.debug("[TEMPLATE RESULT] Formatted content length: %s characters", len(formatted_content))
 
             return {
                 "content": formatted_content,
@@ -19,6 +19,7 @@ limitations under the License.
 
 import csv
 import json
+import logging
 import os
 import re
 import shutil
@@ -40,6 +41,8 @@ from .delivery_payload import (
     normalize_result_data,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class WebResultDeliveryTool(BaseTool):
     """Web-based result delivery tool for presenting results to users"""
@@ -91,7 +94,7 @@ class WebResultDeliveryTool(BaseTool):
         
         # Check if result already exists (idempotent)
         if index_file.exists():
-            print(f"[WEB_RESULT_DELIVERY] Found existing result page for {session_id}/{task_id}")
+            logger.info("[WEB_RESULT_DELIVERY] Found existing result page for %s/%s", session_id, task_id)
             return {
                 "result_url": result_url,
                 "pretty_result_url": pretty_result_url,
@@ -140,7 +143,7 @@ class WebResultDeliveryTool(BaseTool):
                 included_files.extend(str(path) for path in copied_paths)
                 break  # Success
             except ValueError as e:
-                print(f"[WEB_RESULT_DELIVERY] Error copying files: {e}")
+                logger.warning("[WEB_RESULT_DELIVERY] Error copying files: %s", e)
                 if i == 2:
                     raise  # Reraise after final attempt
                 # Retry generation to get correct file paths
@@ -152,7 +155,7 @@ class WebResultDeliveryTool(BaseTool):
         # Get result URL and notify user
         self._notify_user(result_url, session_id, task_id)
         
-        print(f"[WEB_RESULT_DELIVERY] Result delivered for {session_id}/{task_id}")
+        logger.info("[WEB_RESULT_DELIVERY] Result delivered for %s/%s", session_id, task_id)
         return {
             "result_url": result_url,
             "pretty_result_url": pretty_result_url,
@@ -186,7 +189,7 @@ class WebResultDeliveryTool(BaseTool):
             dest_file = dest_dir / target_filename
             try:
                 shutil.copy2(source, dest_file)
-                print(f"[WEB_RESULT_DELIVERY] Copied file: {source_path} -> {target_filename}")
+                logger.debug("[WEB_RESULT_DELIVERY] Copied file: %s -> %s", source_path, target_filename)
                 copied.append(dest_file)
             except Exception as e:
                 raise ValueError(f"[WEB_RESULT_DELIVERY] Error copying {source_path}: {e}")
@@ -201,7 +204,7 @@ class WebResultDeliveryTool(BaseTool):
     def _get_visualization_base_url(self) -> str:
         base_url = os.getenv('VISUALIZATION_SERVER_URL', 'http://localhost:8000')
         if not base_url.startswith(('http://', 'https://')):
-            print(f"[WEB_RESULT_DELIVERY] Warning: VISUALIZATION_SERVER_URL should include protocol, got: {base_url}")
+            logger.warning("[WEB_RESULT_DELIVERY] VISUALIZATION_SERVER_URL should include protocol, got: %s", base_url)
             base_url = f"http://{base_url}"
         return base_url.rstrip('/')
 
@@ -248,7 +251,7 @@ class WebResultDeliveryTool(BaseTool):
         with open(file_path, 'w', encoding='utf-8') as f:
             json.dump(payload, f, ensure_ascii=False, indent=2)
 
-        print(f"[WEB_RESULT_DELIVERY] Saved result data to {file_path}")
+        logger.debug("[WEB_RESULT_DELIVERY] Saved result data to %s", file_path)
 
     def _build_delivery_payload(
         self,
@@ -282,7 +285,7 @@ class WebResultDeliveryTool(BaseTool):
             payload_dict["meta"] = pruned_meta
         with open(file_path, 'w', encoding='utf-8') as f:
             json.dump(payload_dict, f, ensure_ascii=False, indent=2)
-        print(f"[WEB_RESULT_DELIVERY] Saved delivery payload to {file_path}")
+        logger.debug("[WEB_RESULT_DELIVERY] Saved delivery payload to %s", file_path)
 
     def _ensure_downloadable_blocks(self, payload: DeliveryPayload, generated_dir: Path) -> None:
         for block in payload.blocks:
@@ -384,7 +387,7 @@ class WebResultDeliveryTool(BaseTool):
             dest_path = dest_dir / asset.filename
             shutil.copy2(source, dest_path)
             copied.append(dest_path)
-            print(f"[WEB_RESULT_DELIVERY] Copied asset {asset.source_path} -> {dest_path}")
+            logger.debug("[WEB_RESULT_DELIVERY] Copied asset %s -> %s", asset.source_path, dest_path)
         return copied
 
     def _render_fallback_page(self, payload_file_name: str, pretty_page_name: str) -> str:
@@ -1566,9 +1569,9 @@ Return both the HTML content and the file mappings using the provided tool."""
         if not html_content:
             raise ValueError("No HTML content generated by LLM")
         
-        print(f"[WEB_RESULT_DELIVERY] LLM identified {len(file_mappings)} files to serve")
+        logger.info("[WEB_RESULT_DELIVERY] LLM identified %s files to serve", len(file_mappings))
         for mapping in file_mappings:
-            print(f"[WEB_RESULT_DELIVERY]   {mapping.get('type', 'file')}: {mapping.get('source')} -> {mapping.get('target')}")
+            logger.debug("[WEB_RESULT_DELIVERY]   %s: %s -> %s", mapping.get('type', 'file'), mapping.get('source'), mapping.get('target'))
             
         return html_content, file_mappings
 
@@ -18,6 +18,7 @@ limitations under the License.
 """
 
 import json
+import logging
 import os
 import asyncio
 import time
@@ -28,6 +29,8 @@ from typing import Dict, Any, Optional
 from .base_tool import BaseTool
 from .llm_tool import LLMTool
 
+logger = logging.getLogger(__name__)
+
 
 class WebUserCommunicateTool(BaseTool):
     """Web-based user communication tool for interactive message exchange"""
@@ -71,7 +74,7 @@ class WebUserCommunicateTool(BaseTool):
         if response_file.exists():
             with open(response_file, 'r', encoding='utf-8') as f:
                 existing_response = json.load(f)
-            print(f"[WEB_USER_COMMUNICATE] Found existing response for {session_id}/{task_id}")
+            logger.info("[WEB_USER_COMMUNICATE] Found existing response for %s/%s", session_id, task_id)
             return {
                 "instruction": instruction,
                 "form_url": self._get_form_url(session_id, task_id),
@@ -104,7 +107,7 @@ class WebUserCommunicateTool(BaseTool):
                 with open(response_file, 'r', encoding='utf-8') as f:
                     response_data = json.load(f)
                 
-                print(f"[WEB_USER_COMMUNICATE] Received response for {session_id}/{task_id}")
+                logger.info("[WEB_USER_COMMUNICATE] Received response for %s/%s", session_id, task_id)
                 return {
                     "instruction": instruction,
                     "form_url": form_url,
@@ -116,7 +119,7 @@ class WebUserCommunicateTool(BaseTool):
             await asyncio.sleep(poll_interval)
         
         # Timeout reached
-        print(f"[WEB_USER_COMMUNICATE] Timeout waiting for response from {session_id}/{task_id}")
+        logger.warning("[WEB_USER_COMMUNICATE] Timeout waiting for response from %s/%s", session_id, task_id)
         return {
             "instruction": instruction,
             "form_url": form_url,
@@ -127,7 +130,7 @@ class WebUserCommunicateTool(BaseTool):
         """Construct the form URL for the user."""
         base_url = os.getenv('VISUALIZATION_SERVER_URL', 'http://localhost:8000')
         if not base_url.startswith(('http://', 'https://')):
-            print(f"[WEB_USER_COMMUNICATE] Warning: VISUALIZATION_SERVER_URL should include protocol, got: {base_url}")
+            logger.warning("[WEB_USER_COMMUNICATE] VISUALIZATION_SERVER_URL should include protocol, got: %s", base_url)
             base_url = f"http://{base_url}"
         
         return f"{base_url}/user-comm/{session_id}/{task_id}/"
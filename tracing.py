@@ -17,18 +17,40 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import contextvars
 import json
+import logging
+import os
+import threading
 import uuid
-from dataclasses import dataclass, asdict, field
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, field, replace
 from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional, Union, Callable, Generator, TYPE_CHECKING
 from pathlib import Path
 from enum import Enum
 from contextlib import contextmanager
 
+import orjson
+
 if TYPE_CHECKING:
     from doc_execute_engine import PendingTask
 
+logger = logging.getLogger(__name__)
+
+
+def _json_snapshot(value: Any) -> Any:
+    """Deep copy JSON-shaped data, normalized the way it will be written to the session file
+
+    Values JSON cannot represent (objects, sets, bytes) are stringified rather than raised on,
+    so tracing never fails a task over what it is recording.
+    """
+    try:
+        return orjson.loads(orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS))
+    except orjson.JSONEncodeError:
+        # orjson rejects a few values the stdlib accepts (e.g. integers wider than 64 bits)
+        return json.loads(json.dumps(value, default=str))
+
 
 class ExecutionStatus(Enum):
     """Status of execution phases and tasks"""
@@ -308,9 +330,13 @@ class ExecutionSession:
     task_executions: List[TaskExecutionRecord] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(frozen=True)
 class TracingContext:
-    """Internal context for tracking current tracing state"""
+    """Internal context for tracking current tracing state
+
+    Immutable and held in a ContextVar, so concurrent asyncio tasks that enter their own
+    steps (e.g. an LLM call overlapped with another) never see each other's step state.
+    """
     current_phase: Optional[str] = None
     current_sub_step: Optional[str] = None
     current_field_name: Optional[str] = None  # For input field extraction
@@ -319,6 +345,97 @@ class TracingContext:
     llm_call_storage: Optional[Callable[[LLMCall], None]] = None
 
 
+def _convert_enums(obj: Any) -> Any:
+    """Convert ExecutionStatus enums to strings recursively"""
+    if isinstance(obj, dict):
+        return {k: _convert_enums(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [_convert_enums(item) for item in obj]
+    elif isinstance(obj, ExecutionStatus):
+        return obj.value
+    else:
+        return obj
+
+
+def _encode_session(session: 'ExecutionSession') -> bytes:
+    """Encode a session as indented JSON
+
+    orjson serializes the dataclasses and enums natively, so no asdict() copy of the whole
+    session is built first.
+    """
+    try:
+        return orjson.dumps(session, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    except orjson.JSONEncodeError:
+        # orjson rejects a few values the stdlib accepts (e.g. integers wider than 64 bits)
+        return json.dumps(_convert_enums(asdict(session)), ensure_ascii=False, indent=2, default=str).encode('utf-8')
+
+
+def _write_session_file(path: str, data: bytes) -> None:
+    # Ensure the output directory exists (tests may use temp dirs that are created lazily).
+    try:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+    except Exception:
+        # Best-effort: if directory creation fails we'll surface the original open() error.
+        pass
+
+    # Replace the file in one step so readers (e.g. the trace stream) never see a partial write
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class _SessionFileWriter:
+    """Writes encoded session snapshots to disk on a single background thread.
+
+    Every save rewrites the whole file, so only the newest pending snapshot per
+    path is kept; intermediate ones are dropped if the writer falls behind.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[str, bytes] = {}
+        self._draining = False
+        self._idle = threading.Event()
+        self._idle.set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-writer")
+
+    def submit(self, path: str, data: bytes) -> None:
+        with self._lock:
+            self._pending[path] = data
+            if self._draining:
+                return
+            self._draining = True
+            self._idle.clear()
+        self._executor.submit(self._drain)
+
+    def flush(self) -> None:
+        """Block until every submitted snapshot has been written"""
+        self._idle.wait()
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._draining = False
+                    self._idle.set()
+                    return
+                path, data = self._pending.popitem()
+            try:
+                _write_session_file(path, data)
+            except Exception as e:
+                logger.warning("[TRACER] Failed to write session file %s: %s", path, e)
+
+
+_session_writer = _SessionFileWriter()
+
+# Step state of every tracer for the current asyncio task, keyed by tracer. Created once here:
+# contexts keep references to their ContextVars, so per-tracer variables would never be freed.
+# Each update sets a new mapping, so resetting a token restores the enclosing step's state.
+_TRACING_CONTEXT: contextvars.ContextVar[Dict['ExecutionTracer', TracingContext]] = \
+    contextvars.ContextVar("tracing_context")
+
+
 class ExecutionTracer:
     """Main tracer for capturing execution state and events.
 
@@ -331,14 +448,20 @@ class ExecutionTracer:
     it while the session is in progress.
     """
     
-    def __init__(self, output_dir: str = "traces", enabled: bool = True, predefined_session_file: Optional[str] = None):
+    def __init__(self, output_dir: str = "traces", enabled: bool = True, predefined_session_file: Optional[str] = None,
+                 flush_threshold: int = 1):
         self.enabled = enabled
+        # Number of task-start / phase-end events to accumulate before rewriting the session file.
+        # Task ends and session start/end always write. 1 keeps the file current for live viewers.
+        self.flush_threshold = max(1, flush_threshold)
+        self._unsaved_events = 0
         self.output_dir = Path(output_dir)  # Always set output_dir regardless of enabled status
         
         # Always initialize attributes to avoid AttributeError
         self.session: Optional[ExecutionSession] = None
         self.current_task_execution: Optional[TaskExecutionRecord] = None
-        self._context = TracingContext()
+        # Tracing state outside of any step entered through this tracer
+        self._default_context = TracingContext()
         self.tool_call_counter: int = 0
         self.current_session_file: Optional[str] = None  # Track current session file path
         self._predefined_session_file: Optional[str] = None
@@ -361,7 +484,7 @@ class ExecutionTracer:
             try:
                 predefined_path.touch(exist_ok=True)
             except Exception as e:  # Touch failure shouldn't abort tracing
-                print(f"[TRACER] Warning: failed to precreate predefined session file: {e}")
+                logger.warning("[TRACER] Failed to precreate predefined session file: %s", e)
             self._predefined_session_file = str(predefined_path)
         
     def _current_time(self) -> str:
@@ -372,6 +495,17 @@ class ExecutionTracer:
         """Generate unique ID"""
         return str(uuid.uuid4())
     
+    @property
+    def _context(self) -> TracingContext:
+        """Tracing state of the current asyncio task"""
+        return _TRACING_CONTEXT.get({}).get(self, self._default_context)
+
+    def _update_context(self, **changes: Any) -> contextvars.Token:
+        """Replace fields of the current task's tracing state; reset the token to undo"""
+        contexts = dict(_TRACING_CONTEXT.get({}))
+        contexts[self] = replace(contexts.get(self, self._default_context), **changes)
+        return _TRACING_CONTEXT.set(contexts)
+
     def start_session(self, initial_task: str = None) -> str:
         """Start a new execution session"""
         if not self.enabled:
@@ -384,7 +518,7 @@ class ExecutionTracer:
             initial_task_description=initial_task
         )
         
-        print(f"[TRACER] Started session: {session_id}")
+        logger.info("[TRACER] Started session: %s", session_id)
         
         # Save initial session file for real-time monitoring
         self._save_session()
@@ -399,7 +533,7 @@ class ExecutionTracer:
             
         self.session.engine_snapshots[name] = {
             "task_stack": task_stack.copy(),
-            "context": json.loads(json.dumps(context)),  # Deep copy
+            "context": _json_snapshot(context),
             "task_execution_counter": task_execution_counter
         }
     
@@ -416,16 +550,15 @@ class ExecutionTracer:
             parent_task_id=pending_task.parent_task_id,
             short_name=pending_task.short_name,
             start_time=self._current_time(),
-            engine_state_before=json.loads(json.dumps(engine_state))  # Deep copy
+            engine_state_before=_json_snapshot(engine_state)
         )
         
         self.session.task_executions.append(self.current_task_execution)
         
-        print(f"[TRACER] Started task execution: {pending_task.description[:50]}...")
-        print(f"[TRACER] Task ID: {pending_task.task_id}")
+        logger.debug("[TRACER] Started task execution: %s... (task ID: %s)", pending_task.description[:50], pending_task.task_id)
         
         # Save session file for real-time monitoring after task execution start
-        self._save_session()
+        self._record_event()
         
         return pending_task.task_id
     
@@ -434,10 +567,8 @@ class ExecutionTracer:
         if not self.enabled or not self.current_task_execution:
             return
             
-        self._context.current_phase = phase_name
-        self._context.current_sub_step = None
-        self._context.current_field_name = None
-        self._context.llm_call_storage = None
+        self._update_context(current_phase=phase_name, current_sub_step=None,
+                             current_field_name=None, llm_call_storage=None)
         
         if phase_name == "sop_resolution":
             self.current_task_execution.phases[phase_name] = SopResolutionPhase(
@@ -491,9 +622,9 @@ class ExecutionTracer:
         if self._context.llm_call_storage:
             self._context.llm_call_storage(llm_call)
         else:
-            print(f"[TRACER] Warning: No storage context for LLM call in phase {self._context.current_phase}")
+            logger.warning("[TRACER] No storage context for LLM call in phase %s", self._context.current_phase)
         
-        print(f"[TRACER] Logged LLM call in {self._context.current_phase}.{self._context.current_sub_step or 'main'}")
+        logger.debug("[TRACER] Logged LLM call in %s.%s", self._context.current_phase, self._context.current_sub_step or 'main')
         return call_id
     
     def log_tool_call(self, tool_id: str, parameters: Dict[str, Any], output: Any, 
@@ -507,7 +638,7 @@ class ExecutionTracer:
         tool_call = ToolCall(
             tool_call_id=call_id,
             tool_id=tool_id,
-            parameters=json.loads(json.dumps(parameters)),  # Deep copy
+            parameters=_json_snapshot(parameters),
             output=output,
             start_time=self._current_time(),
             end_time=self._current_time(),
@@ -521,7 +652,7 @@ class ExecutionTracer:
             if isinstance(phase, TaskExecutionPhase):
                 phase.tool_execution = tool_call
         
-        print(f"[TRACER] Logged tool call: {tool_id}")
+        logger.debug("[TRACER] Logged tool call: %s", tool_id)
         return call_id
     
     def end_phase(self, phase_data: Dict[str, Any] = None, error: Exception = None) -> None:
@@ -542,12 +673,12 @@ class ExecutionTracer:
                     if hasattr(phase, key):
                         setattr(phase, key, value)
         
-        print(f"[TRACER] Ended phase: {self._context.current_phase}")
+        logger.debug("[TRACER] Ended phase: %s", self._context.current_phase)
         
         # Save session file for real-time monitoring after phase completion
-        self._save_session()
+        self._record_event()
         
-        self._context.current_phase = None
+        self._update_context(current_phase=None)
     
     def end_task_execution(self, engine_state: Dict[str, Any], status: ExecutionStatus, 
                           error: Exception = None) -> None:
@@ -560,12 +691,14 @@ class ExecutionTracer:
         if error:
             self.current_task_execution.error = str(error)
         
-        self.current_task_execution.engine_state_after = json.loads(json.dumps(engine_state))
+        self.current_task_execution.engine_state_after = _json_snapshot(engine_state)
         
-        print(f"[TRACER] Ended task execution: {status.value}")
+        logger.debug("[TRACER] Ended task execution: %s", status.value)
         
-        # Save session file for real-time monitoring after task execution completion
+        # Save session file for real-time monitoring after task execution completion, and wait
+        # for it so a crash in a later task cannot lose this one's record
         self._save_session()
+        _session_writer.flush()
         
         self.current_task_execution = None
     
@@ -577,11 +710,11 @@ class ExecutionTracer:
         self.session.end_time = self._current_time()
         self.session.final_status = final_status
         
-        # Save to file
+        # Save to file and wait for it, so the trace is complete once the session ends
         filename = self._save_session()
+        _session_writer.flush()
         
-        print(f"[TRACER] Ended session: {self.session.session_id}")
-        print(f"[TRACER] Saved trace to: {filename}")
+        logger.info("[TRACER] Ended session %s, saved trace to: %s", self.session.session_id, filename)
         
         session_id = self.session.session_id
         self.session = None
@@ -654,7 +787,7 @@ class ExecutionTracer:
                 )
             except Exception as e:
                 # Snapshot failures shouldn't crash; log and continue
-                print(f"[TRACER] Warning: failed to capture start snapshot: {e}")
+                logger.warning("[TRACER] Failed to capture start snapshot: %s", e)
 
         ctx = SessionContext()
         exception: Optional[Exception] = None
@@ -673,7 +806,7 @@ class ExecutionTracer:
                         state.get("task_execution_counter", 0),
                     )
                 except Exception as snap_err:
-                    print(f"[TRACER] Warning: failed to capture error snapshot: {snap_err}")
+                    logger.warning("[TRACER] Failed to capture error snapshot: %s", snap_err)
             # End session as failed
             self.end_session(ExecutionStatus.FAILED)
             raise
@@ -690,7 +823,7 @@ class ExecutionTracer:
                             state.get("task_execution_counter", 0),
                         )
                     except Exception as e:
-                        print(f"[TRACER] Warning: failed to capture end snapshot: {e}")
+                        logger.warning("[TRACER] Failed to capture end snapshot: %s", e)
                 # Respect explicit status, default to COMPLETED
                 final_status = ctx._status or ExecutionStatus.COMPLETED
                 self.end_session(final_status)
@@ -778,8 +911,8 @@ class ExecutionTracer:
             
         # Initialize the sub-step
         phase.task_generation = NewTaskGeneration(start_time=self._current_time())
-        self._context.current_sub_step = "new_task_generation_step"
-        self._context.llm_call_storage = lambda call: phase.task_generation.llm_calls.append(call)
+        context_token = self._update_context(current_sub_step="new_task_generation_step",
+                                             llm_call_storage=lambda call: phase.task_generation.llm_calls.append(call))
         
         step_ctx = NewTaskGenerationContext()
         exception = None
@@ -802,8 +935,7 @@ class ExecutionTracer:
                 if step_ctx.task_description:
                     phase.task_generation.current_task_description = step_ctx.task_description
             
-            self._context.current_sub_step = None
-            self._context.llm_call_storage = None
+            _TRACING_CONTEXT.reset(context_token)
     
     @contextmanager
     def trace_document_selection_step(self) -> Generator['DocumentSelectionContext', None, None]:
@@ -837,8 +969,8 @@ class ExecutionTracer:
             
         # Initialize the sub-step
         phase.document_selection = DocumentSelection(start_time=self._current_time())
-        self._context.current_sub_step = "document_selection"
-        self._context.llm_call_storage = lambda call: phase.document_selection.llm_calls.append(call)
+        context_token = self._update_context(current_sub_step="document_selection",
+                                             llm_call_storage=lambda call: phase.document_selection.llm_calls.append(call))
         
         step_ctx = DocumentSelectionContext()
         exception = None
@@ -861,8 +993,7 @@ class ExecutionTracer:
                 if step_ctx.loaded_doc:
                     phase.document_selection.loaded_document = step_ctx.loaded_doc
             
-            self._context.current_sub_step = None
-            self._context.llm_call_storage = None
+            _TRACING_CONTEXT.reset(context_token)
     
     @contextmanager
     def trace_input_field_extraction_step(self, field_name: str, description: str) -> Generator['InputFieldExtractionContext', None, None]:
@@ -901,8 +1032,6 @@ class ExecutionTracer:
             start_time=self._current_time()
         )
         phase.input_field_extractions[field_name] = extraction
-        self._context.current_sub_step = "input_field_extraction"
-        self._context.current_field_name = field_name
         
         # Set up storage callback that routes to appropriate LLM call field
         def store_llm_call(call: LLMCall):
@@ -911,7 +1040,9 @@ class ExecutionTracer:
             else:
                 extraction.extraction_code_generation_call = call
         
-        self._context.llm_call_storage = store_llm_call
+        context_token = self._update_context(current_sub_step="input_field_extraction",
+                                             current_field_name=field_name,
+                                             llm_call_storage=store_llm_call)
         
         step_ctx = InputFieldExtractionContext(field_name, description)
         exception = None
@@ -936,9 +1067,7 @@ class ExecutionTracer:
                 if step_ctx.candidate_fields:
                     extraction.candidate_fields = step_ctx.candidate_fields
             
-            self._context.current_sub_step = None
-            self._context.current_field_name = None
-            self._context.llm_call_storage = None
+            _TRACING_CONTEXT.reset(context_token)
     
     @contextmanager
     def batch_extract_input_field(self, input_descriptions: Dict[str, str]) -> Generator['BatchInputFieldExtractionContext', None, None]:
@@ -978,7 +1107,6 @@ class ExecutionTracer:
             start_time=self._current_time()
         )
         phase.batch_input_field_extraction = batch_extraction
-        self._context.current_sub_step = "batch_input_field_extraction"
         
         # Set up storage callback that routes to appropriate LLM call field
         def store_llm_call(call: LLMCall):
@@ -987,7 +1115,8 @@ class ExecutionTracer:
             else:
                 batch_extraction.batch_extraction_call = call
         
-        self._context.llm_call_storage = store_llm_call
+        context_token = self._update_context(current_sub_step="batch_input_field_extraction",
+                                             llm_call_storage=store_llm_call)
         
         step_ctx = BatchInputFieldExtractionContext(input_descriptions)
         exception = None
@@ -1012,8 +1141,7 @@ class ExecutionTracer:
                 if step_ctx.generated_paths:
                     batch_extraction.generated_paths = step_ctx.generated_paths
             
-            self._context.current_sub_step = None
-            self._context.llm_call_storage = None
+            _TRACING_CONTEXT.reset(context_token)
     
     @contextmanager
     def trace_output_path_generation_step(self) -> Generator['OutputPathGenerationContext', None, None]:
@@ -1044,8 +1172,8 @@ class ExecutionTracer:
 
         phase.output_path_generation = OutputPathGeneration(start_time=current_time)
         output_gen = phase.output_path_generation
-        self._context.current_sub_step = "output_path_generation"
-        self._context.llm_call_storage = lambda call: phase.output_path_generation.llm_calls.append(call)
+        context_token = self._update_context(current_sub_step="output_path_generation",
+                                             llm_call_storage=lambda call: phase.output_path_generation.llm_calls.append(call))
 
         assert(output_gen is not None)
 
@@ -1068,8 +1196,7 @@ class ExecutionTracer:
                 if step_ctx.prefixed_path:
                     output_gen.prefixed_path = step_ctx.prefixed_path
 
-            self._context.current_sub_step = None
-            self._context.llm_call_storage = None
+            _TRACING_CONTEXT.reset(context_token)
 
     @contextmanager
     def trace_tool_execution_step(self) -> Generator['ToolExecutionContext', None, None]:
@@ -1098,15 +1225,14 @@ class ExecutionTracer:
             return
 
         # Set up storage to append any LLM calls to the phase.llm_calls list
-        self._context.current_sub_step = "tool_execution"
-        self._context.llm_call_storage = lambda call: phase.llm_calls.append(call)
+        context_token = self._update_context(current_sub_step="tool_execution",
+                                             llm_call_storage=lambda call: phase.llm_calls.append(call))
 
         step_ctx = ToolExecutionContext()
         try:
             yield step_ctx
         finally:
-            self._context.current_sub_step = None
-            self._context.llm_call_storage = None
+            _TRACING_CONTEXT.reset(context_token)
     
     @contextmanager
     def trace_subtree_compaction_step(self) -> Generator['SubtreeCompactionContext', None, None]:
@@ -1134,8 +1260,8 @@ class ExecutionTracer:
             return
 
         # Set up storage to append any LLM calls to the phase.llm_calls list
-        self._context.current_sub_step = "subtree_compaction"
-        self._context.llm_call_storage = lambda call: phase.llm_calls.append(call)
+        context_token = self._update_context(current_sub_step="subtree_compaction",
+                                             llm_call_storage=lambda call: phase.llm_calls.append(call))
 
         step_ctx = SubtreeCompactionContext()
         exception = None
@@ -1159,13 +1285,19 @@ class ExecutionTracer:
                 if exception:
                     phase.error = str(exception)
             
-            self._context.current_sub_step = None
-            self._context.llm_call_storage = None
+            _TRACING_CONTEXT.reset(context_token)
     
+    def _record_event(self) -> None:
+        """Count a traced event and save once flush_threshold events have accumulated"""
+        self._unsaved_events += 1
+        if self._unsaved_events >= self.flush_threshold:
+            self._save_session()
+
     def _save_session(self) -> str:
         """Save session data to JSON file"""
         if not self.session:
             return ""
+        self._unsaved_events = 0
         
         # Generate filename if not already set (first save)
         if not self.current_session_file:
@@ -1176,33 +1308,9 @@ class ExecutionTracer:
                 filename = f"session_{timestamp}_{self.session.session_id[:8]}.json"
                 self.current_session_file = str(self.output_dir / filename)
         
-        # Convert to dict for JSON serialization
-        session_dict = asdict(self.session)
-        
-        # Convert ExecutionStatus enums to strings recursively
-        def convert_enums(obj):
-            if isinstance(obj, dict):
-                return {k: convert_enums(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_enums(item) for item in obj]
-            elif isinstance(obj, ExecutionStatus):
-                return obj.value
-            else:
-                return obj
-        
-        session_dict = convert_enums(session_dict)
-
-        # Ensure the output directory exists (tests may use temp dirs that are created lazily).
-        try:
-            from pathlib import Path
-
-            Path(self.current_session_file).parent.mkdir(parents=True, exist_ok=True)
-        except Exception:
-            # Best-effort: if directory creation fails we'll surface the original open() error.
-            pass
-
-        with open(self.current_session_file, 'w', encoding='utf-8') as f:
-            json.dump(session_dict, f, ensure_ascii=False, indent=2)
+        # Encode on the caller's thread, since the session keeps mutating; the disk write
+        # happens on the background writer so the event loop is not blocked.
+        _session_writer.submit(self.current_session_file, _encode_session(self.session))
         
         return self.current_session_file
 
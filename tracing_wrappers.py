@@ -17,10 +17,13 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import logging
 from typing import Dict, Any, Optional
 from tools.base_tool import BaseTool
 from tracing import ExecutionTracer
 
+logger = logging.getLogger(__name__)
+
 
 class TracingToolWrapper:
     """Wrapper to add tracing capabilities to existing tools"""
@@ -96,7 +99,7 @@ class TracingLLMTool(TracingToolWrapper):
                 end_time=payload.get('end_time')
             )
         except Exception as exc:  # pragma: no cover - logging should not break tool execution
-            print(f"[TRACING LLM] Warning: failed to log LLM call: {exc}")
+            logger.warning("[TRACING LLM] Failed to log LLM call: %s", exc)
 
     async def execute(self, parameters: Dict[str, Any], sop_doc_body: Optional[str] = None, **kwargs) -> Any:
         """Execute LLM tool with enhanced tracing"""
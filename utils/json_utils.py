@@ -5,22 +5,53 @@ Provides:
     set_json_path_value
     get_json_path_value
     extract_key_from_json_path
+    is_simple_json_path
+    compile_json_path
 """
 
+import functools
 import re
 from typing import Dict, Any
 from jsonpath_ng.ext import parse
 
+# Plain member / index chains such as `$.a.b[0].c` can be walked directly without jsonpath_ng.
+# Member names follow jsonpath_ng's own identifier token, which allows hyphens after the first character.
+_SIMPLE_JSON_PATH_RE = re.compile(r"^\$(?:\.[A-Za-z_][A-Za-z0-9_\-]*|\[\d+\])+$")
+_SIMPLE_JSON_PATH_TOKEN_RE = re.compile(r"\.([A-Za-z_][A-Za-z0-9_\-]*)|\[(\d+)\]")
+_DOTTED_JSON_PATH_RE = re.compile(r"^\$(?:\.[A-Za-z_][A-Za-z0-9_]*)+$")
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_json_path(json_path: str):
+    """Parse a JSON path once; the paths used by SOPs and tasks come from a small, repeating set."""
+    return parse(json_path)
+
+
+def is_simple_json_path(json_path: str) -> bool:
+    """Return True for paths made only of `.name` and `[index]` steps."""
+    return _SIMPLE_JSON_PATH_RE.match(json_path) is not None
+
+
+def _walk_simple_json_path(data: Any, json_path: str) -> Any:
+    current = data
+    for key, index in _SIMPLE_JSON_PATH_TOKEN_RE.findall(json_path):
+        try:
+            current = current[key] if key else current[int(index)]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return current
+
 
 def set_json_path_value(data: Dict[str, Any], json_path: str, value: Any) -> None:
     if json_path.startswith('$.') and '.' not in json_path[2:] and '[' not in json_path:
         key = json_path[2:]
         data[key] = value
         return
-    try:
-        parse(json_path)  # validate
-    except Exception as e:
-        raise ValueError(f"Invalid JSON path '{json_path}': {e}")
+    if _DOTTED_JSON_PATH_RE.match(json_path) is None:
+        try:
+            compile_json_path(json_path)  # validate
+        except Exception as e:
+            raise ValueError(f"Invalid JSON path '{json_path}': {e}")
     _ensure_path_exists(data, json_path)
     _set_value_by_path(data, json_path, value)
 
@@ -57,15 +88,19 @@ def _set_value_by_path(data: Dict[str, Any], json_path: str, value: Any) -> None
 def get_json_path_value(data: Dict[str, Any], json_path: str) -> Any:
     if json_path.startswith('$.') and '.' not in json_path[2:] and '[' not in json_path:
         return data.get(json_path[2:])
+    if is_simple_json_path(json_path):
+        return _walk_simple_json_path(data, json_path)
     try:
-        expr = parse(json_path)
+        expr = compile_json_path(json_path)
         matches = expr.find(data)
         return matches[0].value if matches else None
     except Exception:
         return None
 
 
+@functools.lru_cache(maxsize=1024)
 def extract_key_from_json_path(json_path: str) -> str:
+    """Top-level context key a JSON path writes under; cached since tasks keep their output paths."""
     if not json_path or not json_path.startswith('$.'):
         return json_path
     path_part = json_path[2:]
@@ -79,5 +114,7 @@ def extract_key_from_json_path(json_path: str) -> str:
 __all__ = [
     'set_json_path_value',
     'get_json_path_value',
-    'extract_key_from_json_path'
+    'extract_key_from_json_path',
+    'is_simple_json_path',
+    'compile_json_path'
 ]
@@ -19,6 +19,7 @@ The behavior is intentionally kept identical to the previous inline implementati
 
 from __future__ import annotations
 
+import logging
 from typing import Any, Dict, List, Optional, Tuple
 
 from utils.sop_query_rewrite import (
@@ -27,6 +28,8 @@ from utils.sop_query_rewrite import (
     rewrite_for_sop_vector_search,
 )
 
+logger = logging.getLogger(__name__)
+
 
 def _best_score(results: List[Any]) -> float:
     if not results:
@@ -151,7 +154,7 @@ async def vector_search_with_optional_rewrite(
     try:
         first_results = await store.similarity_search(original_query, k=k)
     except Exception as exc:  # pragma: no cover - defensive log
-        print(f"[SOP_VECTOR_SEARCH] Failed to search vector store: {exc}")
+        logger.warning("[SOP_VECTOR_SEARCH] Failed to search vector store: %s", exc)
         raise
 
     first_best_score = _best_score(first_results)
@@ -180,7 +183,7 @@ async def vector_search_with_optional_rewrite(
             try:
                 second_results = await store.similarity_search(rewritten_query, k=k)
             except Exception as exc:  # pragma: no cover - defensive log
-                print(f"[SOP_VECTOR_SEARCH] Failed to search vector store with rewritten query: {exc}")
+                logger.warning("[SOP_VECTOR_SEARCH] Failed to search vector store with rewritten query: %s", exc)
                 raise
 
             # If second search returns empty → keep first search results.